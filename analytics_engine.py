@@ -5,14 +5,108 @@ Implements sports science metrics for training analysis and recommendations
 
 import requests
 import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
-import statistics
-import math
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import logging
+import os
+import sqlite3
 
+# Local cache of Strava payloads; past activities are immutable, so they
+# only need to be fetched once per athlete across process restarts
+ACTIVITY_CACHE_PATH = os.getenv('JOLT_ACTIVITY_CACHE', '.jolt_cache.db')
 
-@dataclass
+logger = logging.getLogger('jolt.analytics')
+
+# Module-level pooled session: engines are constructed per request, so a
+# per-instance session would never reuse a connection across requests
+_session = requests.Session()
+_session.mount('https://', requests.adapters.HTTPAdapter(
+    pool_connections=10, pool_maxsize=50
+))
+
+_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+
+# Athlete ids memoized per token: Strava access tokens rotate every ~6
+# hours, so keying the persistent cache on a token hash would orphan
+# the namespace at every refresh
+_athlete_keys: Dict[str, str] = {}
+
+def _athlete_cache_key(session, headers):
+    """Resolve a stable per-athlete cache namespace for these headers
+
+    Asks Strava for the athlete id once per token; on failure falls
+    back to a token-scoped hash (correct, just without reuse across
+    token rotations) without memoizing, so the next request retries.
+    """
+    auth = str(headers.get('Authorization', ''))
+    key = _athlete_keys.get(auth)
+    if key is not None:
+        return key
+    try:
+        response = session.get(
+            'https://www.strava.com/api/v3/athlete',
+            headers=headers, timeout=_TIMEOUT
+        )
+        response.raise_for_status()
+        key = str(response.json()['id'])
+    except Exception as e:
+        logger.warning("Could not resolve athlete id, scoping cache to token: %s", e)
+        return hashlib.sha256(auth.encode()).hexdigest()[:16]
+    _athlete_keys[auth] = key
+    return key
+
+try:
+    # Numba is an optional accelerator; the NumPy path below is the fallback
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _trimp_daily_loads_numpy(day_idx, moving_time, avg_hr, max_hr, n_days):
+    """Vectorized NumPy fallback for the TRIMP accumulation kernel"""
+    hours = moving_time / 3600
+    if max_hr > 60:
+        intensity = np.clip((avg_hr - 60) / (max_hr - 60), 0, 1)
+    else:
+        # Basic calculation without zone data
+        intensity = avg_hr / 100
+    trimp = np.where(avg_hr > 0, intensity * hours, hours)
+    # bincount accumulates in float64; narrow back to the float32 the rest
+    # of the pipeline flows in
+    return np.bincount(day_idx, weights=trimp, minlength=n_days).astype(np.float32)
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _trimp_daily_loads(day_idx, moving_time, avg_hr, max_hr, n_days):
+        """
+        Fused TRIMP accumulation kernel: intensity, TRIMP and per-day
+        scatter-add in one compiled pass. `max_hr` <= 60 means no zone
+        data, so intensity falls back to avg_hr / 100.
+        """
+        daily_loads = np.zeros(n_days, dtype=np.float32)
+        for i in range(day_idx.size):
+            hours = moving_time[i] / 3600.0
+            if avg_hr[i] > 0:
+                if max_hr > 60.0:
+                    intensity = (avg_hr[i] - 60.0) / (max_hr - 60.0)
+                    intensity = max(0.0, min(1.0, intensity))
+                else:
+                    intensity = avg_hr[i] / 100.0
+                daily_loads[day_idx[i]] += intensity * hours
+            else:
+                daily_loads[day_idx[i]] += hours
+        return daily_loads
+else:
+    _trimp_daily_loads = _trimp_daily_loads_numpy
+
+
+@dataclass(slots=True, frozen=True)
 class TrainingLoad:
     """Training load metrics"""
     atl: float  # Acute Training Load (7-day)
@@ -23,7 +117,7 @@ class TrainingLoad:
     strain: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class IntensityZones:
     """Heart rate or pace zones"""
     zone_1_time: float  # Easy
@@ -34,7 +128,7 @@ class IntensityZones:
     total_time: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PerformanceCurve:
     """Best pace/power at different durations"""
     one_min: float
@@ -44,7 +138,7 @@ class PerformanceCurve:
     sixty_min: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class WellnessMetrics:
     """Subjective wellness data"""
     mood: Optional[int] = None  # 1-5
@@ -55,7 +149,8 @@ class WellnessMetrics:
     perceived_effort: Optional[int] = None  # 1-10
 
 
-@dataclass
+# Slots but not frozen: recommendations is filled in after construction
+@dataclass(slots=True)
 class TrainingInsights:
     """Comprehensive training insights"""
     training_load: TrainingLoad
@@ -67,7 +162,7 @@ class TrainingInsights:
     cadence_analysis: Dict
     wellness_score: Optional[float] = None
     readiness_score: Optional[float] = None
-    recommendations: List[str] = None
+    recommendations: List[str] = field(default_factory=list)
 
 
 class AdvancedAnalyticsEngine:
@@ -75,86 +170,334 @@ class AdvancedAnalyticsEngine:
     Advanced analytics engine for comprehensive training analysis
     """
     
-    def __init__(self, headers):
+    # Bounded worker count keeps us well inside Strava's per-15-min rate limit
+    MAX_FETCH_WORKERS = 8
+
+    # Default HR zone upper bounds (Z1-Z4) when Strava zones are unavailable
+    DEFAULT_ZONE_EDGES = np.array([120, 140, 160, 180], dtype=np.float32)
+
+    def __init__(self, headers, log_level=None):
+        # Only override the module logger when a level is asked for
+        # explicitly; otherwise the app-level logging config governs
+        if log_level is not None:
+            logger.setLevel(log_level)
         self.headers = headers
+        # Engines are built per request; the module-level session keeps
+        # pooled connections alive across them. Auth headers travel per
+        # call, never onto the shared session.
+        self.session = _session
         self.user_zones = None
+        self._daily_load_series = None
+        self._activities_cache: Dict[int, List[Dict]] = {}
+        self._features_cache: Dict[int, pd.DataFrame] = {}
+        # Scope the persistent cache to the athlete, not the token, so
+        # token rotations keep reading the same namespace
+        self._athlete_key = _athlete_cache_key(self.session, headers)
         self._load_user_zones()
-    
+
+    def _cache_conn(self):
+        """Open the local SQLite activity cache, creating the schema if needed"""
+        conn = sqlite3.connect(ACTIVITY_CACHE_PATH)
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS activities ('
+            ' athlete_key TEXT NOT NULL,'
+            ' id INTEGER NOT NULL,'
+            ' start_date TEXT NOT NULL,'
+            ' payload TEXT NOT NULL,'
+            ' detail_payload TEXT,'
+            ' PRIMARY KEY (athlete_key, id))'
+        )
+        # Earliest window start ever fully fetched per athlete: the
+        # delta-fetch optimisation is only sound when the cache is known
+        # to reach back at least this far
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS coverage ('
+            ' athlete_key TEXT PRIMARY KEY,'
+            ' fetched_from TEXT NOT NULL)'
+        )
+        return conn
+
+    def _load_cached_activities(self, cutoff: str) -> Dict[int, Dict]:
+        """Load cached activity summaries on/after the cutoff date, keyed by id"""
+        try:
+            with self._cache_conn() as conn:
+                rows = conn.execute(
+                    'SELECT payload FROM activities WHERE athlete_key = ? AND start_date >= ?',
+                    (self._athlete_key, cutoff)
+                ).fetchall()
+            return {a['id']: a for a in (json.loads(row[0]) for row in rows)}
+        except Exception as e:
+            logger.warning("Activity cache read failed: %s", e)
+            return {}
+
+    def _store_cached_activities(self, activities: List[Dict]):
+        """Upsert fetched activity summaries, preserving any cached detail"""
+        if not activities:
+            return
+        try:
+            with self._cache_conn() as conn:
+                conn.executemany(
+                    'INSERT INTO activities (athlete_key, id, start_date, payload)'
+                    ' VALUES (?, ?, ?, ?)'
+                    ' ON CONFLICT (athlete_key, id) DO UPDATE SET'
+                    ' start_date = excluded.start_date, payload = excluded.payload',
+                    [
+                        (self._athlete_key, a['id'], a['start_date_local'][:10], json.dumps(a))
+                        for a in activities
+                    ]
+                )
+        except Exception as e:
+            logger.warning("Activity cache write failed: %s", e)
+
+    def _load_coverage(self) -> Optional[str]:
+        """Earliest window-start date the cache is known to cover, or None"""
+        try:
+            with self._cache_conn() as conn:
+                row = conn.execute(
+                    'SELECT fetched_from FROM coverage WHERE athlete_key = ?',
+                    (self._athlete_key,)
+                ).fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            logger.warning("Coverage read failed: %s", e)
+            return None
+
+    def _store_coverage(self, fetched_from: str):
+        """Record that a fetch reached back to fetched_from (keeps the minimum)"""
+        try:
+            with self._cache_conn() as conn:
+                conn.execute(
+                    'INSERT INTO coverage (athlete_key, fetched_from) VALUES (?, ?)'
+                    ' ON CONFLICT (athlete_key) DO UPDATE SET'
+                    ' fetched_from = MIN(fetched_from, excluded.fetched_from)',
+                    (self._athlete_key, fetched_from)
+                )
+        except Exception as e:
+            logger.warning("Coverage write failed: %s", e)
+
+    def _load_cached_details(self, activity_ids: List[int]) -> Dict[int, Dict]:
+        """Load cached activity detail payloads for the given ids"""
+        if not activity_ids:
+            return {}
+        try:
+            placeholders = ','.join('?' * len(activity_ids))
+            with self._cache_conn() as conn:
+                rows = conn.execute(
+                    f'SELECT id, detail_payload FROM activities'
+                    f' WHERE athlete_key = ? AND id IN ({placeholders})'
+                    f' AND detail_payload IS NOT NULL',
+                    (self._athlete_key, *activity_ids)
+                ).fetchall()
+            return {row[0]: json.loads(row[1]) for row in rows}
+        except Exception as e:
+            logger.warning("Detail cache read failed: %s", e)
+            return {}
+
+    def _store_cached_details(self, details: Dict[int, Dict]):
+        """Attach detail payloads to already-cached activity rows"""
+        if not details:
+            return
+        try:
+            with self._cache_conn() as conn:
+                conn.executemany(
+                    'UPDATE activities SET detail_payload = ?'
+                    ' WHERE athlete_key = ? AND id = ?',
+                    [
+                        (json.dumps(detail), self._athlete_key, activity_id)
+                        for activity_id, detail in details.items()
+                    ]
+                )
+        except Exception as e:
+            logger.warning("Detail cache write failed: %s", e)
+
+    def _get_activities(self, days: int) -> List[Dict]:
+        """
+        Get activities for the last `days` days, memoized per window so the
+        seven analysis methods share one Strava fetch instead of seven
+        """
+        if days in self._activities_cache:
+            return self._activities_cache[days]
+
+        # A wider cached window already covers this one: filter in memory
+        # instead of refetching identical JSON
+        wider = [k for k in self._activities_cache if k > days]
+        if wider:
+            cutoff = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+            subset = [
+                a for a in self._activities_cache[min(wider)]
+                if a['start_date_local'][:10] >= cutoff
+            ]
+            self._activities_cache[days] = subset
+            return subset
+
+        start_date = datetime.now() - timedelta(days=days)
+        after = int(start_date.timestamp())
+        cutoff = start_date.strftime('%Y-%m-%d')
+
+        # Past days are immutable, so only ask Strava for the delta after
+        # the newest locally cached activity — but only when the coverage
+        # watermark proves the cache reaches back to the window start.
+        # Rows from a previous, narrower window must not suppress the
+        # fetch for the part of this window they never covered.
+        cached = self._load_cached_activities(cutoff)
+        coverage = self._load_coverage()
+        if cached and coverage is not None and coverage <= cutoff:
+            newest = max(a['start_date_local'][:19] for a in cached.values())
+            after = max(after, int(datetime.fromisoformat(newest).timestamp()))
+
+        logger.debug("Fetching activities from Strava API (after %s)", datetime.fromtimestamp(after).strftime('%Y-%m-%d'))
+        response = self.session.get(
+            'https://www.strava.com/api/v3/athlete/activities',
+            headers=self.headers,
+            params={
+                'after': after,
+                'per_page': 200
+            },
+            timeout=_TIMEOUT
+        )
+
+        if response.status_code != 200:
+            logger.warning("Failed to fetch activities: %s - %s", response.status_code, response.text)
+            # Serve stale cache rather than nothing when Strava is down
+            fetched = []
+        else:
+            fetched = response.json()
+            logger.info("Fetched %d activities from Strava API (%d cached locally)", len(fetched), len(cached))
+            self._store_cached_activities(fetched)
+            self._store_coverage(cutoff)
+
+        cached.update({a['id']: a for a in fetched})
+        activities = sorted(cached.values(), key=lambda a: a['start_date_local'])
+        self._activities_cache[days] = activities
+        return activities
+
+    def _build_features(self, days: int) -> pd.DataFrame:
+        """
+        Build one columnar feature frame shared by the summary analyses.
+
+        Parsing dates and converting units once here replaces a separate
+        Python traversal of the activity list in each analysis method.
+        """
+        if days in self._features_cache:
+            return self._features_cache[days]
+
+        activities = self._get_activities(days)
+        if not activities:
+            df = pd.DataFrame(columns=[
+                'date', 'distance_km', 'hours', 'elevation',
+                'elev_per_km', 'avg_cadence', 'type'
+            ])
+        else:
+            df = pd.DataFrame(activities)
+            for column, default in (
+                ('total_elevation_gain', 0.0),
+                ('average_cadence', np.nan),
+                ('type', None),
+            ):
+                if column not in df:
+                    df[column] = default
+            # The fixed-width U10 cast truncates each value to its
+            # YYYY-MM-DD prefix in one vectorized pass, with no per-row
+            # datetime allocation
+            df['date'] = df['start_date_local'].to_numpy(dtype='U10').astype('datetime64[D]')
+            df['distance_km'] = df['distance'] / 1000
+            df['hours'] = df['moving_time'] / 3600
+            df['elevation'] = df['total_elevation_gain'].fillna(0)
+            df['elev_per_km'] = df['elevation'] / df['distance_km'].replace(0, np.nan)
+            df['avg_cadence'] = df['average_cadence']
+            df = df[[
+                'date', 'distance_km', 'hours', 'elevation',
+                'elev_per_km', 'avg_cadence', 'type'
+            ]]
+
+        self._features_cache[days] = df
+        return df
+
     def _load_user_zones(self):
         """Load user's heart rate zones from Strava"""
         try:
-            print("🔍 Fetching athlete zones from Strava API...")
-            response = requests.get(
+            logger.debug("Fetching athlete zones from Strava API...")
+            response = self.session.get(
                 'https://www.strava.com/api/v3/athlete/zones',
-                headers=self.headers
+                headers=self.headers,
+                timeout=_TIMEOUT
             )
             if response.status_code == 200:
                 self.user_zones = response.json()
-                print(f"✅ Loaded user zones: {self.user_zones}")
+                logger.debug("Loaded user zones: %s", self.user_zones)
             else:
-                print(f"⚠️ Could not load zones (status {response.status_code}): {response.text}")
+                logger.warning("Could not load zones (status %s): %s", response.status_code, response.text)
                 self.user_zones = None
         except Exception as e:
-            print(f"❌ Could not load user zones: {e}")
+            logger.warning("Could not load user zones: %s", e)
             self.user_zones = None
+
+        # Precompute zone upper bounds once so zone lookup is a binary
+        # search over a small sorted array instead of a per-call scan.
+        # The last zone has no meaningful max (Strava reports -1), so only
+        # the first Z-1 bounds are edges.
+        self._zone_edges = self.DEFAULT_ZONE_EDGES
+        if self.user_zones and 'heart_rate' in self.user_zones:
+            zones = self.user_zones['heart_rate'].get('zones', [])
+            if len(zones) >= 2:
+                self._zone_edges = np.array(
+                    [zone['max'] for zone in zones[:-1]], dtype=np.float32
+                )
     
     def calculate_training_load(self, days: int = 90) -> TrainingLoad:
         """
         Calculate ATL, CTL, TSB, ACWR, Monotony, and Strain
         """
-        print(f"📊 Calculating training load for last {days} days...")
+        logger.info("Calculating training load for last %d days", days)
         
         # Get activities for the specified period
         end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        start_timestamp = int(start_date.timestamp())
-        
-        print(f"🔍 Fetching activities from Strava API (after {start_date.strftime('%Y-%m-%d')})...")
-        response = requests.get(
-            'https://www.strava.com/api/v3/athlete/activities',
-            headers=self.headers,
-            params={
-                'after': start_timestamp,
-                'per_page': 200
-            }
-        )
-        
-        if response.status_code != 200:
-            print(f"❌ Failed to fetch activities: {response.status_code} - {response.text}")
-            return TrainingLoad(0, 0, 0, 0, 0, 0)
-        
-        activities = response.json()
-        print(f"✅ Fetched {len(activities)} activities from Strava API")
+        activities = self._get_activities(days)
         
         if not activities:
             return TrainingLoad(0, 0, 0, 0, 0, 0)
         
         # Calculate daily training loads (TRIMP-based)
         daily_loads = self._calculate_daily_trimp_loads(activities)
-        print(f"📈 Calculated {len(daily_loads)} days of training load data")
-        
+        logger.debug("Calculated %d days of training load data", len(daily_loads))
+
+        # Keep the full daily series on the instance for charting/reuse;
+        # the scalar metrics below come from one sweep over the tail slices
+        # instead of materializing whole rolling curves per metric
+        loads = np.asarray(daily_loads, dtype=np.float32)
+        self._daily_load_series = pd.Series(
+            loads,
+            index=pd.date_range(end=end_date.date(), periods=loads.size)
+        )
+
+        tail_7 = loads[-7:]
+        tail_28 = loads[-28:]
+
         # Calculate ATL (7-day rolling average)
-        atl = self._calculate_rolling_average(daily_loads, 7)
-        print(f"🔥 ATL (7-day): {round(atl, 2)}")
-        
+        atl = float(tail_7.mean())
+
         # Calculate CTL (42-day rolling average)
-        ctl = self._calculate_rolling_average(daily_loads, 42)
-        print(f"📊 CTL (42-day): {round(ctl, 2)}")
-        
+        ctl = float(loads[-42:].mean())
+
         # Calculate TSB (CTL - ATL)
         tsb = ctl - atl
-        print(f"⚖️ TSB (Balance): {round(tsb, 2)}")
-        
+
         # Calculate ACWR (7-day load / 28-day load)
-        weekly_load_7d = sum(daily_loads[-7:]) if len(daily_loads) >= 7 else 0
-        weekly_load_28d = sum(daily_loads[-28:]) if len(daily_loads) >= 28 else 0
+        weekly_load_7d = float(tail_7.sum()) if loads.size >= 7 else 0
+        weekly_load_28d = float(tail_28.sum()) if loads.size >= 28 else 0
         acwr = weekly_load_7d / (weekly_load_28d / 4) if weekly_load_28d > 0 else 0
-        print(f"📊 ACWR (7d/28d ratio): {round(acwr, 2)}")
-        
-        # Calculate Monotony and Strain
-        monotony = self._calculate_monotony(daily_loads)
+
+        # Calculate Monotony and Strain (mean / std dev over the last 28 days)
+        monotony = 1.0
+        if loads.size >= 7 and tail_28.size > 1:
+            std_28 = float(tail_28.std(ddof=1))
+            monotony = float(tail_28.mean()) / std_28 if std_28 > 0 else 1.0
         strain = weekly_load_7d * monotony if monotony > 0 else weekly_load_7d
-        print(f"🔄 Monotony: {round(monotony, 2)}, Strain: {round(strain, 2)}")
+
+        logger.debug(
+            "ATL %.2f, CTL %.2f, TSB %.2f, ACWR %.2f, monotony %.2f, strain %.2f",
+            atl, ctl, tsb, acwr, monotony, strain
+        )
         
         return TrainingLoad(
             atl=round(atl, 2),
@@ -165,355 +508,265 @@ class AdvancedAnalyticsEngine:
             strain=round(strain, 2)
         )
     
-    def _calculate_daily_trimp_loads(self, activities: List[Dict]) -> List[float]:
-        """Calculate daily TRIMP loads from activities"""
-        daily_loads = {}
-        
-        for activity in activities:
-            date = datetime.fromisoformat(
-                activity['start_date_local'].replace('Z', '+00:00')
-            ).date()
-            
-            # Base load from duration and type
-            base_load = activity.get('moving_time', 0) / 3600  # hours
-            
-            # Adjust for intensity if HR data available
-            if activity.get('average_heartrate'):
-                hr_load = self._calculate_hr_trimp(
-                    activity['average_heartrate'], 
-                    activity['moving_time']
-                )
-                base_load = hr_load
-            
-            daily_loads[date] = daily_loads.get(date, 0) + base_load
-        
-        # Convert to sorted list of daily loads
-        sorted_dates = sorted(daily_loads.keys())
-        return [daily_loads[date] for date in sorted_dates]
-    
-    def _calculate_hr_trimp(self, avg_hr: float, duration: int) -> float:
-        """Calculate TRIMP from average heart rate"""
-        # Simple TRIMP calculation (can be enhanced with zones)
-        if not self.user_zones or 'heart_rate' not in self.user_zones:
-            # Use basic calculation
-            return (avg_hr / 100) * (duration / 3600)
-        
-        # Use actual zones if available
-        hr_zones = self.user_zones['heart_rate']
-        max_hr = hr_zones.get('max', 200)  # Default max HR
-        
-        # Calculate intensity factor
-        intensity = (avg_hr - 60) / (max_hr - 60)  # Normalized intensity
-        intensity = max(0, min(1, intensity))  # Clamp between 0 and 1
-        
-        return intensity * (duration / 3600)  # TRIMP = intensity × duration
-    
-    def _calculate_rolling_average(self, daily_loads: List[float], window: int) -> float:
-        """Calculate rolling average training load"""
-        if len(daily_loads) < window:
-            return sum(daily_loads) / len(daily_loads) if daily_loads else 0
-        
-        return sum(daily_loads[-window:]) / window
-    
-    def _calculate_monotony(self, daily_loads: List[float]) -> float:
-        """Calculate training monotony (mean / std dev)"""
-        if len(daily_loads) < 7:
-            return 1.0
-        
-        mean_load = statistics.mean(daily_loads[-28:])  # Last 28 days
-        std_load = statistics.stdev(daily_loads[-28:]) if len(daily_loads) >= 28 else 1.0
-        
-        return mean_load / std_load if std_load > 0 else 1.0
+    def _calculate_daily_trimp_loads(self, activities: List[Dict]) -> np.ndarray:
+        """Calculate daily TRIMP loads from activities (vectorized)"""
+        count = len(activities)
+
+        # Strava's start_date_local always begins with YYYY-MM-DD, so the
+        # 10-char prefix is enough to bucket activities into calendar days
+        days = np.fromiter(
+            (a['start_date_local'][:10] for a in activities),
+            dtype='U10', count=count
+        ).astype('datetime64[D]')
+        day_idx = (days - days.min()).astype(np.int32)
+
+        moving_time = np.fromiter(
+            (a.get('moving_time', 0) or 0 for a in activities),
+            dtype=np.float32, count=count
+        )
+        avg_hr = np.fromiter(
+            (a.get('average_heartrate') or 0 for a in activities),
+            dtype=np.float32, count=count
+        )
+
+        max_hr = 0.0
+        if self.user_zones and 'heart_rate' in self.user_zones:
+            max_hr = float(self.user_zones['heart_rate'].get('max', 200))  # Default max HR
+
+        # TRIMP = intensity × duration, scatter-summed per calendar day in
+        # the compiled kernel (Numba when installed, NumPy otherwise)
+        return _trimp_daily_loads(
+            day_idx, moving_time, avg_hr, max_hr, int(day_idx.max()) + 1
+        )
     
     def analyze_intensity_distribution(self, days: int = 28) -> IntensityZones:
         """
         Analyze time spent in different intensity zones
         """
-        print(f"🎯 Analyzing intensity distribution for last {days} days...")
+        logger.info("Analyzing intensity distribution for last %d days", days)
         
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        start_timestamp = int(start_date.timestamp())
-        
-        print(f"🔍 Fetching activities for intensity analysis...")
-        response = requests.get(
-            'https://www.strava.com/api/v3/athlete/activities',
-            headers=self.headers,
-            params={
-                'after': start_timestamp,
-                'per_page': 200
-            }
-        )
-        
-        if response.status_code != 200:
-            print(f"❌ Failed to fetch activities for intensity: {response.status_code}")
-            return IntensityZones(0, 0, 0, 0, 0, 0)
+        activities = self._get_activities(days)
         
-        activities = response.json()
-        print(f"✅ Fetched {len(activities)} activities for intensity analysis")
-        
-        zone_times = [0.0, 0.0, 0.0, 0.0, 0.0]  # Z1-Z5
+        zone_times = np.zeros(5, dtype=np.float32)  # Z1-Z5
         total_time = 0.0
-        
-        for activity in activities:
+
+        # Fetch activity details concurrently: the loop is dominated by
+        # network round-trips, so overlapping them cuts wall time ~8x
+        details = self._fetch_activity_details(activities)
+
+        # Gather (HR, hours) samples across all laps first, then bin and
+        # scatter-add them in two C calls instead of one += per lap
+        sample_hr = []
+        sample_hours = []
+        for activity, activity_detail in zip(activities, details):
             duration = activity.get('moving_time', 0) / 3600  # hours
             total_time += duration
-            
-            # Try to get detailed zone data
+
             try:
-                print(f"🔍 Fetching detailed data for activity {activity['id']}...")
-                detail_response = requests.get(
-                    f'https://www.strava.com/api/v3/activities/{activity["id"]}',
-                    headers=self.headers
-                )
-                
-                if detail_response.status_code == 200:
-                    activity_detail = detail_response.json()
+                if activity_detail is not None:
                     if 'laps' in activity_detail:
-                        print(f"📊 Found {len(activity_detail['laps'])} laps for detailed zone analysis")
+                        logger.debug("Found %d laps for detailed zone analysis", len(activity_detail['laps']))
                         for lap in activity_detail['laps']:
-                            if 'average_heartrate' in lap and lap['average_heartrate']:
-                                zone = self._determine_hr_zone(lap['average_heartrate'])
-                                zone_times[zone] += lap['moving_time'] / 3600
-                    else:
+                            if lap.get('average_heartrate'):
+                                sample_hr.append(lap['average_heartrate'])
+                                sample_hours.append(lap['moving_time'] / 3600)
+                    elif activity.get('average_heartrate'):
                         # Fallback: estimate from average HR
-                        if activity.get('average_heartrate'):
-                            zone = self._determine_hr_zone(activity['average_heartrate'])
-                            zone_times[zone] += duration
-                else:
-                    print(f"⚠️ Could not fetch activity detail (status {detail_response.status_code})")
+                        sample_hr.append(activity['average_heartrate'])
+                        sample_hours.append(duration)
             except Exception as e:
-                print(f"❌ Could not analyze zones for activity {activity['id']}: {e}")
-        
-        print(f"🎯 Intensity Zone Distribution:")
-        print(f"   Zone 1 (Easy): {zone_times[0]:.1f}h ({zone_times[0]/total_time*100:.1f}%)")
-        print(f"   Zone 2 (Aerobic): {zone_times[1]:.1f}h ({zone_times[1]/total_time*100:.1f}%)")
-        print(f"   Zone 3 (Tempo): {zone_times[2]:.1f}h ({zone_times[2]/total_time*100:.1f}%)")
-        print(f"   Zone 4 (Threshold): {zone_times[3]:.1f}h ({zone_times[3]/total_time*100:.1f}%)")
-        print(f"   Zone 5 (VO2 Max): {zone_times[4]:.1f}h ({zone_times[4]/total_time*100:.1f}%)")
+                logger.warning("Could not analyze zones for activity %s: %s", activity['id'], e)
+
+        if sample_hr:
+            zone_idx = self._determine_hr_zone(np.asarray(sample_hr, dtype=np.float32))
+            np.add.at(zone_times, zone_idx, np.asarray(sample_hours, dtype=np.float32))
+
+        if total_time > 0:
+            logger.debug(
+                "Intensity zone distribution (hours Z1-Z5): %s of %.1fh total",
+                [round(t, 1) for t in zone_times], total_time
+            )
         
         return IntensityZones(
-            zone_1_time=zone_times[0],
-            zone_2_time=zone_times[1],
-            zone_3_time=zone_times[2],
-            zone_4_time=zone_times[3],
-            zone_5_time=zone_times[4],
+            zone_1_time=float(zone_times[0]),
+            zone_2_time=float(zone_times[1]),
+            zone_3_time=float(zone_times[2]),
+            zone_4_time=float(zone_times[3]),
+            zone_5_time=float(zone_times[4]),
             total_time=total_time
         )
     
-    def _determine_hr_zone(self, avg_hr: float) -> int:
-        """Determine heart rate zone (1-5)"""
-        if not self.user_zones or 'heart_rate' not in self.user_zones:
-            # Use basic estimation
-            if avg_hr < 120:
-                return 0  # Zone 1
-            elif avg_hr < 140:
-                return 1  # Zone 2
-            elif avg_hr < 160:
-                return 2  # Zone 3
-            elif avg_hr < 180:
-                return 3  # Zone 4
-            else:
-                return 4  # Zone 5
-        
-        # Use actual zones
-        hr_zones = self.user_zones['heart_rate']
-        zones = hr_zones.get('zones', [])
-        
-        for i, zone in enumerate(zones):
-            if avg_hr <= zone['max']:
-                return i
-        
-        return 4  # Default to zone 5
+    def _fetch_activity_details(self, activities: List[Dict]) -> List[Optional[Dict]]:
+        """Fetch detailed activity payloads concurrently over the shared session"""
+
+        def fetch(activity):
+            try:
+                logger.debug("Fetching detailed data for activity %s", activity['id'])
+                response = self.session.get(
+                    f'https://www.strava.com/api/v3/activities/{activity["id"]}',
+                    headers=self.headers,
+                    timeout=_TIMEOUT
+                )
+                if response.status_code == 200:
+                    return response.json()
+                logger.warning("Could not fetch activity detail (status %s)", response.status_code)
+            except Exception as e:
+                logger.warning("Could not fetch detail for activity %s: %s", activity['id'], e)
+            return None
+
+        if not activities:
+            return []
+
+        # Serve details from the persistent cache and only fetch the misses
+        cached = self._load_cached_details([a['id'] for a in activities])
+        missing = [a for a in activities if a['id'] not in cached]
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.MAX_FETCH_WORKERS) as executor:
+                fetched = list(executor.map(fetch, missing))
+            new_details = {
+                a['id']: detail
+                for a, detail in zip(missing, fetched) if detail is not None
+            }
+            self._store_cached_details(new_details)
+            cached.update(new_details)
+
+        return [cached.get(a['id']) for a in activities]
+
+    def _determine_hr_zone(self, avg_hr):
+        """
+        Determine heart rate zone indices (0-4) by binary search over the
+        precomputed zone edges. Accepts a scalar or an array of HR values.
+        """
+        return np.minimum(np.searchsorted(self._zone_edges, avg_hr, side='left'), 4)
     
     def calculate_performance_curve(self, days: int = 90) -> PerformanceCurve:
         """
         Calculate best pace/power at different durations
         """
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        start_timestamp = int(start_date.timestamp())
-        
-        response = requests.get(
-            'https://www.strava.com/api/v3/athlete/activities',
-            headers=self.headers,
-            params={
-                'after': start_timestamp,
-                'per_page': 200
-            }
+        activities = self._get_activities(days)
+
+        runs = [a for a in activities if a.get('type') == 'Run']
+
+        # Stack duration/distance into arrays and take the masked minimum
+        # per target duration instead of a Python activities x targets loop
+        duration = np.fromiter(
+            (a.get('moving_time', 0) / 60 for a in runs),
+            dtype=np.float32, count=len(runs)
+        )  # minutes
+        distance_km = np.fromiter(
+            (a.get('distance', 0) / 1000 for a in runs),
+            dtype=np.float32, count=len(runs)
         )
-        
-        if response.status_code != 200:
-            print(f"❌ Failed to fetch activities: {response.status_code}")
-            return []
-        
-        activities = response.json()
-        
-        best_times = {
-            1: float('inf'),    # 1 minute
-            5: float('inf'),    # 5 minutes
-            10: float('inf'),   # 10 minutes
-            20: float('inf'),   # 20 minutes
-            60: float('inf')    # 60 minutes
-        }
-        
-        for activity in activities:
-            if activity.get('type') != 'Run':
-                continue
-                
-            duration = activity.get('moving_time', 0) / 60  # minutes
-            
-            # Check if this activity sets a new best for any duration
-            for target_duration in best_times:
-                if duration >= target_duration:
-                    # Calculate average pace for this duration
-                    distance_km = activity.get('distance', 0) / 1000
-                    if distance_km > 0:
-                        pace_per_km = duration / distance_km
-                        if pace_per_km < best_times[target_duration]:
-                            best_times[target_duration] = pace_per_km
-        
+        pace_per_km = np.where(distance_km > 0, duration / np.where(distance_km > 0, distance_km, 1), np.inf)
+
+        targets = (1, 5, 10, 20, 60)
+        bests = [float(pace_per_km[duration >= target].min(initial=np.inf)) for target in targets]
+
         # Convert to actual pace values (replace inf with None)
+        bests = [best if np.isfinite(best) else None for best in bests]
         return PerformanceCurve(
-            one_min=best_times[1] if best_times[1] != float('inf') else None,
-            five_min=best_times[5] if best_times[5] != float('inf') else None,
-            ten_min=best_times[10] if best_times[10] != float('inf') else None,
-            twenty_min=best_times[20] if best_times[20] != float('inf') else None,
-            sixty_min=best_times[60] if best_times[60] != float('inf') else None
+            one_min=bests[0],
+            five_min=bests[1],
+            ten_min=bests[2],
+            twenty_min=bests[3],
+            sixty_min=bests[4]
         )
     
     def analyze_volume_trends(self, days: int = 90) -> Dict:
         """
         Analyze training volume trends over time
         """
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        start_timestamp = int(start_date.timestamp())
-        
-        response = requests.get(
-            'https://www.strava.com/api/v3/athlete/activities',
-            headers=self.headers,
-            params={
-                'after': start_timestamp,
-                'per_page': 200
+        df = self._build_features(days)
+
+        if df.empty:
+            return {
+                'weekly_volumes': {},
+                'distance_trend_pct': 0,
+                'total_distance_km': 0,
+                'total_time_hours': 0,
+                'avg_sessions_per_week': 0
             }
-        )
-        
-        if response.status_code != 200:
-            print(f"❌ Failed to fetch activities: {response.status_code}")
-            return []
-        
-        activities = response.json()
-        
-        # Calculate weekly volumes
-        weekly_volumes = {}
-        for activity in activities:
-            date = datetime.fromisoformat(
-                activity['start_date_local'].replace('Z', '+00:00')
+
+        # Aggregate weekly volumes in one C-level groupby pass instead of
+        # per-activity dict upserts. Weeks are floored to their Monday in
+        # integer day space (epoch day 0 was a Thursday, so Mondays sit at
+        # day 4 mod 7); the 8-byte keys group and sort faster than strings
+        # and, unlike resample, empty weeks never materialize
+        day_numbers = df['date'].values.astype('datetime64[D]').view('i8')
+        week_starts = ((day_numbers - 4) // 7 * 7 + 4).astype('datetime64[D]')
+        weekly = (
+            df.groupby(week_starts)
+            .agg(
+                distance=('distance_km', 'sum'),
+                time=('hours', 'sum'),
+                activities=('distance_km', 'count')
             )
-            week_start = date - timedelta(days=date.weekday())
-            week_key = week_start.strftime('%Y-%W')
-            
-            if week_key not in weekly_volumes:
-                weekly_volumes[week_key] = {
-                    'distance': 0,
-                    'time': 0,
-                    'activities': 0
-                }
-            
-            weekly_volumes[week_key]['distance'] += activity.get('distance', 0) / 1000  # km
-            weekly_volumes[week_key]['time'] += activity.get('moving_time', 0) / 3600  # hours
-            weekly_volumes[week_key]['activities'] += 1
-        
+        )
+
         # Calculate trends
-        weeks = sorted(weekly_volumes.keys())
-        if len(weeks) >= 4:
-            recent_weeks = weeks[-4:]
-            older_weeks = weeks[-8:-4] if len(weeks) >= 8 else weeks[:-4]
-            
-            recent_avg_distance = sum(weekly_volumes[w]['distance'] for w in recent_weeks) / len(recent_weeks)
-            older_avg_distance = sum(weekly_volumes[w]['distance'] for w in older_weeks) / len(older_weeks) if older_weeks else recent_avg_distance
-            
+        distance = weekly['distance']
+        if len(weekly) >= 4:
+            recent_avg_distance = float(distance.iloc[-4:].mean())
+            older = distance.iloc[-8:-4] if len(weekly) >= 8 else distance.iloc[:-4]
+            older_avg_distance = float(older.mean()) if len(older) else recent_avg_distance
+
             distance_trend = ((recent_avg_distance - older_avg_distance) / older_avg_distance * 100) if older_avg_distance > 0 else 0
         else:
             distance_trend = 0
-        
+
+        # Stringify the week keys once at the JSON edge (ISO date of the
+        # week's Monday) instead of strftime per bucket during aggregation
+        weekly_volumes = dict(zip(
+            np.datetime_as_string(weekly.index.values.astype('datetime64[D]')),
+            weekly.to_dict('index').values()
+        ))
+
         return {
             'weekly_volumes': weekly_volumes,
             'distance_trend_pct': round(distance_trend, 1),
-            'total_distance_km': sum(w['distance'] for w in weekly_volumes.values()),
-            'total_time_hours': sum(w['time'] for w in weekly_volumes.values()),
-            'avg_sessions_per_week': sum(w['activities'] for w in weekly_volumes.values()) / len(weeks) if weeks else 0
+            'total_distance_km': float(distance.sum()),
+            'total_time_hours': float(weekly['time'].sum()),
+            'avg_sessions_per_week': float(weekly['activities'].sum()) / len(weekly)
         }
     
     def analyze_consistency(self, days: int = 90) -> Dict:
         """
         Analyze training consistency metrics
         """
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        start_timestamp = int(start_date.timestamp())
-        
-        response = requests.get(
-            'https://www.strava.com/api/v3/athlete/activities',
-            headers=self.headers,
-            params={
-                'after': start_timestamp,
-                'per_page': 200
-            }
-        )
-        
-        if response.status_code != 200:
-            print(f"❌ Failed to fetch activities: {response.status_code}")
-            return []
-        
-        activities = response.json()
-        
-        # Calculate days between activities
-        activity_dates = []
-        for activity in activities:
-            date = datetime.fromisoformat(
-                activity['start_date_local'].replace('Z', '+00:00')
-            ).date()
-            activity_dates.append(date)
-        
-        activity_dates.sort()
-        
-        if len(activity_dates) < 2:
+        df = self._build_features(days)
+
+        # Activity dates as sorted epoch day numbers; diffing the raw int64
+        # view yields day gaps directly, with no timedelta64 intermediate
+        activity_days = np.sort(df['date'].values.astype('datetime64[D]').view('i8'))
+
+        if activity_days.size < 2:
             return {
                 'consistency_score': 0,
                 'avg_gap_days': 0,
                 'longest_streak': 0,
                 'current_streak': 0
             }
-        
-        # Calculate gaps between activities
-        gaps = []
-        for i in range(1, len(activity_dates)):
-            gap = (activity_dates[i] - activity_dates[i-1]).days
-            gaps.append(gap)
-        
+
+        # Gaps between consecutive activities in one vectorized diff
+        gaps = np.diff(activity_days)
+
         # Calculate consistency score (lower std dev = more consistent)
-        avg_gap = statistics.mean(gaps)
-        gap_std = statistics.stdev(gaps) if len(gaps) > 1 else 0
+        avg_gap = float(gaps.mean())
+        gap_std = float(gaps.std(ddof=1)) if gaps.size > 1 else 0
         consistency_score = max(0, 100 - (gap_std * 5))  # Penalty for high variability
-        
-        # Calculate streaks
-        current_streak = 1
-        longest_streak = 1
-        temp_streak = 1
-        
-        for i in range(1, len(gaps)):
-            if gaps[i] <= 3:  # Within 3 days
-                temp_streak += 1
-                longest_streak = max(longest_streak, temp_streak)
-            else:
-                temp_streak = 1
-        
-        # Check current streak
-        if gaps and gaps[-1] <= 3:
-            current_streak = temp_streak
-        
+
+        # Streaks as run lengths of gaps <= 3 days, computed branchlessly:
+        # edges of the padded mask mark where each run starts and ends
+        mask = (gaps <= 3).astype(np.int8)
+        edges = np.diff(np.concatenate(([0], mask, [0])))
+        run_starts = np.flatnonzero(edges == 1)
+        run_ends = np.flatnonzero(edges == -1)
+        run_lengths = run_ends - run_starts
+
+        longest_streak = int(run_lengths.max()) + 1 if run_lengths.size else 1
+        current_streak = int(run_lengths[-1]) + 1 if mask.size and mask[-1] else 1
+
         return {
             'consistency_score': round(consistency_score, 1),
             'avg_gap_days': round(avg_gap, 1),
@@ -525,96 +778,49 @@ class AdvancedAnalyticsEngine:
         """
         Analyze terrain and elevation patterns
         """
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        start_timestamp = int(start_date.timestamp())
-        
-        response = requests.get(
-            'https://www.strava.com/api/v3/athlete/activities',
-            headers=self.headers,
-            params={
-                'after': start_timestamp,
-                'per_page': 200
-            }
-        )
-        
-        if response.status_code != 200:
-            print(f"❌ Failed to fetch activities: {response.status_code}")
-            return []
-        
-        activities = response.json()
-        
-        elevation_data = []
-        flat_runs = 0
-        hilly_runs = 0
-        
-        for activity in activities:
-            elevation_gain = activity.get('total_elevation_gain', 0)
-            distance = activity.get('distance', 0) / 1000  # km
-            
-            if distance > 0:
-                elevation_per_km = elevation_gain / distance
-                elevation_data.append(elevation_per_km)
-                
-                if elevation_per_km < 20:  # Less than 20m per km
-                    flat_runs += 1
-                elif elevation_per_km > 50:  # More than 50m per km
-                    hilly_runs += 1
-        
-        avg_elevation_per_km = statistics.mean(elevation_data) if elevation_data else 0
-        
+        df = self._build_features(days)
+
+        # NaN elev_per_km (zero-distance activities) drops out of both the
+        # mean and the comparisons, matching the old distance > 0 filter
+        elev_per_km = df['elev_per_km']
+        flat_runs = int((elev_per_km < 20).sum())  # Less than 20m per km
+        hilly_runs = int((elev_per_km > 50).sum())  # More than 50m per km
+
+        avg_elevation_per_km = float(elev_per_km.mean()) if elev_per_km.notna().any() else 0
+
         return {
             'avg_elevation_per_km': round(avg_elevation_per_km, 1),
-            'total_elevation_gain': sum(a.get('total_elevation_gain', 0) for a in activities),
-            'flat_runs_pct': round((flat_runs / len(activities) * 100), 1) if activities else 0,
-            'hilly_runs_pct': round((hilly_runs / len(activities) * 100), 1) if activities else 0,
-            'terrain_variety_score': round(100 - abs(flat_runs - hilly_runs) / len(activities) * 100, 1) if activities else 0
+            'total_elevation_gain': float(df['elevation'].sum()),
+            'flat_runs_pct': round((flat_runs / len(df) * 100), 1) if len(df) else 0,
+            'hilly_runs_pct': round((hilly_runs / len(df) * 100), 1) if len(df) else 0,
+            'terrain_variety_score': round(100 - abs(flat_runs - hilly_runs) / len(df) * 100, 1) if len(df) else 0
         }
     
     def analyze_cadence(self, days: int = 90) -> Dict:
         """
         Analyze cadence patterns and consistency
         """
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        start_timestamp = int(start_date.timestamp())
-        
-        response = requests.get(
-            'https://www.strava.com/api/v3/athlete/activities',
-            headers=self.headers,
-            params={
-                'after': start_timestamp,
-                'per_page': 200
-            }
-        )
-        
-        if response.status_code != 200:
-            print(f"❌ Failed to fetch activities: {response.status_code}")
-            return []
-        
-        activities = response.json()
-        
-        cadence_data = []
-        for activity in activities:
-            if activity.get('type') == 'Run' and activity.get('average_cadence'):
-                cadence_data.append(activity['average_cadence'])
-        
-        if not cadence_data:
+        df = self._build_features(days)
+
+        # Runs with a recorded (non-zero) cadence, in chronological order
+        cadence = df.loc[
+            (df['type'] == 'Run') & (df['avg_cadence'] > 0), 'avg_cadence'
+        ].to_numpy(dtype=np.float32)
+
+        if cadence.size == 0:
             return {
                 'avg_cadence': None,
                 'cadence_consistency': 0,
                 'cadence_trend': 0
             }
-        
-        avg_cadence = statistics.mean(cadence_data)
-        cadence_std = statistics.stdev(cadence_data) if len(cadence_data) > 1 else 0
+
+        avg_cadence = float(cadence.mean())
+        cadence_std = float(cadence.std(ddof=1)) if cadence.size > 1 else 0
         cadence_consistency = max(0, 100 - (cadence_std * 2))  # Penalty for high variability
-        
+
         # Calculate trend
-        if len(cadence_data) >= 4:
-            recent_avg = statistics.mean(cadence_data[-4:])
-            older_avg = statistics.mean(cadence_data[:-4])
-            cadence_trend = recent_avg - older_avg
+        if cadence.size >= 4:
+            cadence_trend = float(cadence[-4:].mean() - cadence[:-4].mean())
         else:
             cadence_trend = 0
         
@@ -720,43 +926,42 @@ class AdvancedAnalyticsEngine:
         """
         Get comprehensive training insights combining all metrics
         """
-        print(f"\n🚀 === COMPREHENSIVE ANALYTICS FOR LAST {days} DAYS ===")
-        print(f"📅 Analysis Period: {datetime.now() - timedelta(days=days)} to {datetime.now()}")
-        
-        print(f"\n1️⃣ TRAINING LOAD ANALYSIS")
-        training_load = self.calculate_training_load(days)
-        
-        print(f"\n2️⃣ INTENSITY DISTRIBUTION ANALYSIS")
-        intensity_distribution = self.analyze_intensity_distribution(days)
-        
-        print(f"\n3️⃣ PERFORMANCE CURVE ANALYSIS")
-        performance_curve = self.calculate_performance_curve(days)
-        
-        print(f"\n4️⃣ VOLUME TRENDS ANALYSIS")
-        volume_trends = self.analyze_volume_trends(days)
-        
-        print(f"\n5️⃣ CONSISTENCY ANALYSIS")
-        consistency_metrics = self.analyze_consistency(days)
-        
-        print(f"\n6️⃣ TERRAIN ANALYSIS")
-        terrain_analysis = self.analyze_terrain(days)
-        
-        print(f"\n7️⃣ CADENCE ANALYSIS")
-        cadence_analysis = self.analyze_cadence(days)
-        
+        logger.info("Running comprehensive analytics for last %d days", days)
+
+        # Prewarm the shared per-window caches once so the analyses below
+        # only read them
+        self._get_activities(days)
+        self._build_features(days)
+
+        # The seven analyses are independent and the expensive ones are
+        # I/O-bound (detail fetches), so overlap them on the shared session
+        with ThreadPoolExecutor(max_workers=7) as executor:
+            futures = [
+                executor.submit(analysis, days)
+                for analysis in (
+                    self.calculate_training_load,
+                    self.analyze_intensity_distribution,
+                    self.calculate_performance_curve,
+                    self.analyze_volume_trends,
+                    self.analyze_consistency,
+                    self.analyze_terrain,
+                    self.analyze_cadence,
+                )
+            ]
+            (training_load, intensity_distribution, performance_curve,
+             volume_trends, consistency_metrics, terrain_analysis,
+             cadence_analysis) = [future.result() for future in futures]
+
         wellness_score = None
         readiness_score = None
-        
+
         if wellness_data:
-            print(f"\n8️⃣ WELLNESS ANALYSIS")
             wellness_score = self.calculate_wellness_score(wellness_data, training_load)
             readiness_score = self.calculate_readiness_score(wellness_score, training_load)
-            print(f"💚 Wellness Score: {wellness_score}/100")
-            print(f"🎯 Readiness Score: {readiness_score}/100")
+            logger.debug("Wellness score %s/100, readiness score %s/100", wellness_score, readiness_score)
         else:
-            print(f"\n8️⃣ WELLNESS ANALYSIS - No wellness data provided")
-        
-        print(f"\n9️⃣ GENERATING RECOMMENDATIONS")
+            logger.debug("No wellness data provided")
+
         insights = TrainingInsights(
             training_load=training_load,
             intensity_distribution=intensity_distribution,
@@ -770,7 +975,6 @@ class AdvancedAnalyticsEngine:
         )
         
         insights.recommendations = self.generate_recommendations(insights)
-        print(f"💡 Generated {len(insights.recommendations)} recommendations")
-        
-        print(f"\n✅ === ANALYTICS COMPLETE ===")
+        logger.debug("Generated %d recommendations", len(insights.recommendations))
+
         return insights
@@ -1,29 +1,94 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
-from supabase import create_client, Client
+from flask import Flask, g, render_template, request, redirect, url_for, session, flash, jsonify
+from flask.json.provider import JSONProvider
+import logging
+import orjson
+
+# Optional: incremental JSON parsing for large stream payloads
+try:
+    import ijson
+except ImportError:
+    ijson = None
 import requests
 from dotenv import load_dotenv
 import json
 import statistics
-from analytics_engine import AdvancedAnalyticsEngine, WellnessMetrics, TrainingInsights
-from performance_psychology import PerformancePsychologyEngine
 from strava_token_manager import StravaTokenManager
 from strava_webhook_manager import StravaWebhookManager
 from sleep_engine import SleepEngine
+import base64
 import hashlib
+import hmac
 import secrets
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from functools import wraps
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+import time
+import threading
+import queue
+import atexit
+from collections import OrderedDict
+from urllib.parse import urlencode
+from datetime import datetime, timedelta, timezone
 
 # Load environment variables
 load_dotenv()
 
+# Leveled logging instead of print: set LOG_LEVEL=DEBUG/INFO locally,
+# keep the production default quiet
+logging.basicConfig(
+    level=os.getenv('LOG_LEVEL', 'WARNING'),
+    format='%(asctime)s %(levelname)s %(name)s %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson's C encoder"""
+
+    def dumps(self, obj, **kwargs):
+        # OPT_NON_STR_KEYS matches stdlib-json's coercion of int keys,
+        # which some analytics payloads rely on
+        return orjson.dumps(
+            obj,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
 app.secret_key = os.getenv('FLASK_SECRET_KEY', 'your-secret-key-here')
+app.json = OrjsonProvider(app)
+# Don't re-sign and re-set the session cookie on every response; it only
+# needs refreshing when the session actually changes
+app.config['SESSION_REFRESH_EACH_REQUEST'] = False
+
+# Server-side sessions when Redis is configured: the cookie carries only
+# a session id instead of shipping the signed user blob (multi-KB once
+# Strava athlete data is in it) on every request and response
+REDIS_URL = os.getenv('REDIS_URL')
+redis_client = None
+if REDIS_URL:
+    try:
+        import redis
+        from flask_session import Session
+
+        redis_client = redis.from_url(REDIS_URL)
+        app.config.update(
+            SESSION_TYPE='redis',
+            SESSION_REDIS=redis_client,
+            SESSION_USE_SIGNER=True
+        )
+        Session(app)
+    except ImportError:
+        logger.warning("REDIS_URL set but redis/Flask-Session not installed; using cookie sessions")
 
 # CalorieNinjas API configuration
 CALORIE_NINJAS_API_URL = os.getenv('CALORIE_NINJAS_API_URL', 'https://api.calorieninjas.com/v1/nutrition')
 CALORIE_NINJAS_API_KEY = os.getenv('CALORIE_NINJAS_API_KEY')  # Fallback to your key
+CN_HEADERS = {'X-Api-Key': CALORIE_NINJAS_API_KEY}
 
 # Supabase configuration
 SUPABASE_URL = os.getenv('SUPABASE_URL')
@@ -37,15 +102,64 @@ strava_token_manager = None
 strava_webhook_manager = None
 sleep_engine = None
 
+# The analytics modules pull in numpy and pandas at import, which is
+# dead weight for workers serving only auth/webhook/OAuth traffic, so
+# they're imported on first use inside these factories
+def _analytics_engine(headers, **kwargs):
+    from analytics_engine import AdvancedAnalyticsEngine
+    return AdvancedAnalyticsEngine(headers, **kwargs)
+
+def _psychology_engine(headers, user_id=None, access_token=None):
+    from performance_psychology import PerformancePsychologyEngine
+    fetcher = None
+    if user_id is not None and access_token is not None:
+        # Route the engine's activity-list fetches through the shared
+        # cached fetcher so psychology endpoints reuse warm lists
+        def fetcher(**params):
+            return fetch_strava_activities(user_id, access_token, **params)
+    return PerformancePsychologyEngine(headers, activities_fetcher=fetcher)
+
+def _widen_supabase_pool(client):
+    """Raise the PostgREST httpx pool limits above the default
+
+    supabase-py's underlying httpx client keeps ~10 connections; under
+    concurrent requests everything beyond that queues. This swaps in a
+    client with a wider keep-alive pool, preserving the base URL and
+    auth headers. It reaches into library internals, so any version
+    drift is logged and tolerated rather than fatal.
+    """
+    try:
+        import httpx
+
+        old = client.postgrest.session
+        client.postgrest.session = httpx.Client(
+            base_url=old.base_url,
+            headers=old.headers,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+    except Exception as e:
+        logger.warning("Could not widen Supabase connection pool: %s", e)
+
 if SUPABASE_URL and SUPABASE_KEY:
     try:
+        # Imported here rather than at module top: supabase drags in
+        # httpx/pydantic and friends, and unconfigured runs (local
+        # template work, smoke tests) shouldn't pay that import cost
+        from supabase import create_client, Client
+
         supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
         # Create admin client with service role key for bypassing RLS
         if SUPABASE_SERVICE_KEY:
             supabase_admin: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
         else:
             supabase_admin = supabase  # Fallback to regular client
-        
+
+        _widen_supabase_pool(supabase)
+        if supabase_admin is not supabase:
+            _widen_supabase_pool(supabase_admin)
+
+
         # Initialize Strava managers
         strava_token_manager = StravaTokenManager(supabase, supabase_admin)
         strava_webhook_manager = StravaWebhookManager(supabase, supabase_admin, strava_token_manager)
@@ -54,81 +168,478 @@ if SUPABASE_URL and SUPABASE_KEY:
         sleep_engine = SleepEngine(supabase)
         
     except Exception as e:
-        print(f"Warning: Failed to initialize Supabase client: {e}")
-        print("Please check your SUPABASE_URL and SUPABASE_KEY in .env file")
+        logger.warning("Failed to initialize Supabase client: %s", e)
+        logger.warning("Please check your SUPABASE_URL and SUPABASE_KEY in .env file")
 else:
-    print("Warning: SUPABASE_URL and SUPABASE_KEY not configured")
-    print("Please set these values in your .env file")
+    logger.warning("SUPABASE_URL and SUPABASE_KEY not configured")
+    logger.warning("Please set these values in your .env file")
 
 # Strava configuration
 STRAVA_CLIENT_ID = os.getenv('STRAVA_CLIENT_ID')
 STRAVA_CLIENT_SECRET = os.getenv('STRAVA_CLIENT_SECRET')
 STRAVA_REDIRECT_URI = os.getenv('STRAVA_REDIRECT_URI', 'https://jolt.nikhilrado.com/strava/callback')
 
+# The OAuth URL is static apart from the per-request CSRF state, so build
+# the prefix once at import time with the redirect URI properly encoded
+STRAVA_AUTH_URL_BASE = 'https://www.strava.com/oauth/authorize?' + urlencode({
+    'client_id': STRAVA_CLIENT_ID or '',
+    'response_type': 'code',
+    'redirect_uri': STRAVA_REDIRECT_URI,
+    'approval_prompt': 'auto',  # Use 'auto' instead of 'force' for better UX
+    'scope': 'read,activity:read_all',  # Request minimal required scopes
+})
+
+# Shared HTTP session for outbound Strava/OAuth calls: connection pooling
+# and TLS keep-alive mean one handshake per pooled connection instead of
+# one per request
+http = requests.Session()
+http.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Separate pooled session for CalorieNinjas — different host, so it
+# keeps its own keep-alive connections and retry budget
+cn_http = requests.Session()
+cn_http.mount('https://', HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# (connect, read) timeout so a stale pooled connection can't hang a request
+HTTP_TIMEOUT = (3.05, 10)
+
+# Small shared pool for fire-and-forget work (e.g. Strava deauthorize)
+# that shouldn't block a user-facing response
+_background = ThreadPoolExecutor(max_workers=4, thread_name_prefix='jolt-bg')
+
+# Strava rate-limit gate: every response carries the 15-minute window
+# usage in X-RateLimit-Usage/-Limit. Track it and refuse outbound calls
+# once the window is nearly spent — hammering Strava past the cap just
+# burns quota on guaranteed 429s. 429 retries themselves are handled by
+# the session's Retry policy, which honours Retry-After.
+STRAVA_RATE_GUARD = 0.9  # refuse calls at >=90% of the short window
+STRAVA_RATE_SOFT = 0.8  # skip optional calls (e.g. streams) above this
+_strava_rate = {'usage': 0, 'limit': 600, 'window': 0}
+_strava_rate_lock = threading.Lock()
+
+class StravaRateLimited(Exception):
+    """Raised when the Strava 15-minute request budget is nearly spent"""
+
+def _strava_window():
+    # Strava quotas reset on the quarter hour
+    return int(time.time() // 900)
+
+def _note_strava_rate(response):
+    """Record the short-window usage reported on a Strava response"""
+    usage = response.headers.get('X-RateLimit-Usage')
+    limit = response.headers.get('X-RateLimit-Limit')
+    if not usage or not limit:
+        return
+    try:
+        short_usage = int(usage.split(',')[0])
+        short_limit = int(limit.split(',')[0])
+    except ValueError:
+        return
+    with _strava_rate_lock:
+        _strava_rate.update(usage=short_usage, limit=short_limit, window=_strava_window())
+
+def _strava_budget_tight(threshold=STRAVA_RATE_SOFT):
+    """True when the current 15-minute window sits above the threshold
+
+    Lets callers shed optional work (stream fetches) before the hard
+    gate in strava_request starts refusing everything.
+    """
+    with _strava_rate_lock:
+        return (_strava_rate['window'] == _strava_window()
+                and _strava_rate['usage'] >= _strava_rate['limit'] * threshold)
+
+def strava_request(method, url, **kwargs):
+    """Issue a Strava API call through the pooled session with the
+    rate-limit gate in front and usage accounting behind"""
+    with _strava_rate_lock:
+        if (_strava_rate['window'] == _strava_window()
+                and _strava_rate['usage'] >= _strava_rate['limit'] * STRAVA_RATE_GUARD):
+            raise StravaRateLimited(
+                f"Strava 15-minute budget nearly spent "
+                f"({_strava_rate['usage']}/{_strava_rate['limit']})"
+            )
+    kwargs.setdefault('timeout', HTTP_TIMEOUT)
+    response = http.request(method, url, **kwargs)
+    _note_strava_rate(response)
+    return response
+
+def _cache_put(cache, lock, key, value, max_entries):
+    """Insert into a bounded in-process cache, evicting oldest entries
+
+    The OrderedDict caches below are LRU: reads move hot keys to the
+    end, so the entries popped here are the least recently used. The
+    cap keeps a long-lived worker's memory flat instead of accreting
+    every payload it ever fetched.
+    """
+    with lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
+# TTL cache for Strava /athlete/activities responses: the list rarely
+# changes between page views while Strava's rate limits are tight. When
+# Redis is configured a second, shorter-lived tier shares fetched lists
+# across workers so each gunicorn process doesn't pay its own fetch.
+ACTIVITIES_CACHE_TTL = 6 * 3600  # seconds
+ACTIVITIES_REDIS_TTL = 600  # seconds
+ACTIVITIES_CACHE_MAX = 1024  # entries
+_strava_activities_cache = OrderedDict()
+_strava_activities_lock = threading.Lock()
+
+def fetch_strava_activities(user_id, access_token, **params):
+    """Fetch /athlete/activities with a per-user TTL cache in front
+
+    Returns the decoded activity list; raises requests.HTTPError on a
+    non-200 response. Entries are keyed by user and query parameters.
+    """
+    key = (user_id, tuple(sorted(params.items())))
+    now = time.time()
+    with _strava_activities_lock:
+        entry = _strava_activities_cache.get(key)
+        if entry and now - entry['at'] < ACTIVITIES_CACHE_TTL:
+            _strava_activities_cache.move_to_end(key)
+            return entry['activities']
+
+    redis_key = None
+    if redis_client is not None:
+        qualifier = ','.join(f'{k}={v}' for k, v in sorted(params.items()))
+        redis_key = f"strava:activities:{user_id}:{qualifier or 'default'}"
+        try:
+            cached = redis_client.get(redis_key)
+            if cached is not None:
+                activities = orjson.loads(cached)
+                _cache_put(_strava_activities_cache, _strava_activities_lock, key, {
+                    'at': now,
+                    'activities': activities,
+                    'etag': None,
+                    'last_modified': None,
+                }, ACTIVITIES_CACHE_MAX)
+                return activities
+        except Exception as e:
+            logger.warning("Redis activities cache read failed: %s", e)
+
+    headers = {'Authorization': f'Bearer {access_token}'}
+    # Revalidate an expired entry instead of refetching: a 304 costs no
+    # body bytes and no JSON parse
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    response = strava_request(
+        'GET',
+        'https://www.strava.com/api/v3/athlete/activities',
+        headers=headers,
+        params=params
+    )
+
+    if response.status_code == 304 and entry:
+        # Nothing changed upstream; extend the TTL on the cached payload
+        entry['at'] = now
+        return entry['activities']
+
+    response.raise_for_status()
+    activities = orjson.loads(response.content)
+    _cache_put(_strava_activities_cache, _strava_activities_lock, key, {
+        'at': now,
+        'activities': activities,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }, ACTIVITIES_CACHE_MAX)
+    if redis_key is not None:
+        try:
+            redis_client.setex(redis_key, ACTIVITIES_REDIS_TTL, response.content)
+        except Exception as e:
+            logger.warning("Redis activities cache write failed: %s", e)
+    return activities
+
+def fetch_strava_activities_all(user_id, access_token, max_pages=5, **params):
+    """Fetch every page of /athlete/activities, up to max_pages
+
+    Page 1 comes first; only when it returns full does the helper fan
+    out, fetching the remaining page numbers concurrently instead of
+    paying one round-trip per page in sequence. Each page lands in the
+    per-page cache, so repeat calls skip the fan-out entirely.
+    """
+    per_page = params.get('per_page', 30)
+    first = fetch_strava_activities(user_id, access_token, page=1, **params)
+    if len(first) < per_page or max_pages <= 1:
+        return first
+
+    activities = list(first)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [
+            pool.submit(fetch_strava_activities, user_id, access_token,
+                        page=page, **params)
+            for page in range(2, max_pages + 1)
+        ]
+        for future in futures:
+            activities.extend(future.result())
+    return activities
+
+# Short-lived in-process cache for computed insight objects: the summary
+# endpoints recompute the same 30/90-day aggregates on every page
+# refresh. Entries are live dataclass containers, so this tier stays
+# in-process (nothing to serialize); the Redis tier above shares the raw
+# activity lists the computation starts from.
+INSIGHTS_CACHE_TTL = 60  # seconds
+INSIGHTS_CACHE_MAX = 256
+_insights_cache = OrderedDict()  # (user_id, kind, ...) -> (cached_at, value)
+_insights_cache_lock = threading.Lock()
+
+def _cached_insights(key, compute):
+    """Memoize a computed insights object for INSIGHTS_CACHE_TTL seconds
+
+    Keys start with the user id so a wellness submit can drop every
+    cached result for that user in one pass.
+    """
+    now = time.time()
+    with _insights_cache_lock:
+        entry = _insights_cache.get(key)
+        if entry and now - entry[0] < INSIGHTS_CACHE_TTL:
+            _insights_cache.move_to_end(key)
+            return entry[1]
+    value = compute()
+    with _insights_cache_lock:
+        _insights_cache[key] = (now, value)
+        _insights_cache.move_to_end(key)
+        while len(_insights_cache) > INSIGHTS_CACHE_MAX:
+            _insights_cache.popitem(last=False)
+    return value
+
+def _invalidate_insights(user_id):
+    """Drop a user's cached insights after their wellness data changes"""
+    with _insights_cache_lock:
+        for key in [k for k in _insights_cache if k[0] == user_id]:
+            del _insights_cache[key]
+
+def now_iso():
+    """Current UTC time as an ISO string, formatted once per call site"""
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
 # Personal Access Token utilities
 def generate_pat():
     """Generate a new personal access token"""
-    return f"jolt_pat_{secrets.token_hex(28)}"  # 64 chars total
+    return f"jolt_pat_{secrets.token_urlsafe(32)}"  # 32 bytes of entropy, URL-safe
 
 def hash_token(token):
-    """Create SHA-256 hash of token for database storage"""
-    return hashlib.sha256(token.encode()).hexdigest()
+    """Create SHA-256 hash of token (base64) for database storage"""
+    return base64.b64encode(hashlib.sha256(token.encode()).digest()).decode()
+
+# Valid PAT lengths: 'jolt_pat_' + token_urlsafe(32) (43 chars) today,
+# or + token_hex(28) (56 chars) for tokens minted before the urlsafe
+# switch. Checking length first rejects sprayed garbage before it costs
+# a SHA-256 and a cache probe.
+_PAT_LENGTHS = frozenset({len('jolt_pat_') + 43, len('jolt_pat_') + 56})
 
 def verify_token(token, token_hash):
-    """Verify a token against its hash"""
-    return hashlib.sha256(token.encode()).hexdigest() == token_hash
+    """Verify a token against its hash in constant time"""
+    if len(token) not in _PAT_LENGTHS:
+        return False
+    return hmac.compare_digest(hash_token(token), token_hash)
+
+# In-process LRU+TTL cache of validated PAT records: hot tokens skip the
+# per-request Supabase SELECT, and last_used_at touches are batched to a
+# background flush instead of one UPDATE round-trip per request
+TOKEN_CACHE_TTL = 60  # seconds
+# Shared tier matches the in-process TTL so a rotated-out token is never
+# honoured longer than it already could be on another worker
+TOKEN_REDIS_TTL = 60  # seconds; deleted eagerly on revoke
+TOKEN_CACHE_MAX = 10_000
+LAST_USED_FLUSH_INTERVAL = 30  # seconds
+_token_cache = OrderedDict()  # token_hash -> (cached_at, token_record)
+_token_cache_lock = threading.Lock()
+_last_used_pending = {}  # token id -> iso timestamp
+_last_used_lock = threading.Lock()
+_last_used_flusher_started = False
+
+def _lookup_token_record(token_hash):
+    """Resolve an active PAT hash to its record via the LRU+TTL cache"""
+    now = time.time()
+    with _token_cache_lock:
+        entry = _token_cache.get(token_hash)
+        if entry and now - entry[0] < TOKEN_CACHE_TTL:
+            _token_cache.move_to_end(token_hash)
+            return entry[1]
+
+    # Warm path for other workers: a sibling process may have validated
+    # this hash already and shared the record via Redis
+    if redis_client is not None:
+        try:
+            cached = redis_client.get(f"pat:{token_hash}")
+            if cached is not None:
+                record = orjson.loads(cached)
+                with _token_cache_lock:
+                    _token_cache[token_hash] = (now, record)
+                    _token_cache.move_to_end(token_hash)
+                return record
+        except Exception as e:
+            logger.warning("Redis token cache read failed: %s", e)
+
+    # Cold path: the verify_pat RPC validates the hash and touches
+    # last_used_at in one round-trip instead of a SELECT then UPDATE.
+    # Fall back to the plain SELECT where migration 008 isn't applied.
+    try:
+        result = supabase.rpc('verify_pat', {'p_hash': token_hash}).execute()
+    except Exception:
+        # Only the columns the auth decorators actually read; paired
+        # with the covering index in migration 009 this is index-only
+        result = supabase.table('personal_access_tokens').select(
+            'id,user_id,expires_at,expires_at_epoch'
+        ).eq('token_hash', token_hash).eq('is_active', True).execute()
+    if not result.data:
+        return None
+
+    record = result.data[0]
+    # Normalise legacy rows on the way into the cache: parse expires_at
+    # once here so the per-request expiry check is a float compare
+    if not record.get('expires_at_epoch') and record.get('expires_at'):
+        try:
+            record['expires_at_epoch'] = datetime.fromisoformat(
+                record['expires_at'].replace('Z', '+00:00')
+            ).timestamp()
+        except ValueError:
+            logger.warning("Unparseable expires_at on token %s", record.get('id'))
+    with _token_cache_lock:
+        _token_cache[token_hash] = (now, record)
+        _token_cache.move_to_end(token_hash)
+        while len(_token_cache) > TOKEN_CACHE_MAX:
+            _token_cache.popitem(last=False)
+    if redis_client is not None:
+        try:
+            redis_client.setex(f"pat:{token_hash}", TOKEN_REDIS_TTL, orjson.dumps(record))
+        except Exception as e:
+            logger.warning("Redis token cache write failed: %s", e)
+    return record
+
+def _invalidate_user_tokens(user_id, token_hashes=()):
+    """Drop cached PAT records for a user (called on revoke)
+
+    Revoke routes pass the hashes of the rows they deactivated so the
+    shared Redis entries go too, not just this worker's.
+    """
+    with _token_cache_lock:
+        stale = [
+            key for key, (_, record) in _token_cache.items()
+            if record.get('user_id') == user_id
+        ]
+        for key in stale:
+            del _token_cache[key]
+    if redis_client is not None and token_hashes:
+        try:
+            redis_client.delete(*[f"pat:{h}" for h in token_hashes])
+        except Exception as e:
+            logger.warning("Redis token cache invalidation failed: %s", e)
+
+def _record_token_use(token_id):
+    """Queue a last_used_at touch for the background flush"""
+    global _last_used_flusher_started
+    with _last_used_lock:
+        _last_used_pending[token_id] = now_iso()
+        if not _last_used_flusher_started:
+            _last_used_flusher_started = True
+            threading.Thread(target=_flush_last_used_loop, daemon=True).start()
+
+def _drain_last_used_pending():
+    with _last_used_lock:
+        pending = dict(_last_used_pending)
+        _last_used_pending.clear()
+    return pending
+
+def _flush_last_used(pending):
+    """Write queued last_used_at touches as one batched update"""
+    if not pending:
+        return
+    try:
+        # One statement for the whole batch; the newest queued timestamp
+        # is within the flush interval of each token's actual last use
+        supabase.table('personal_access_tokens').update({
+            'last_used_at': max(pending.values())
+        }).in_('id', list(pending)).execute()
+    except Exception as e:
+        logger.warning("Failed to flush last_used_at batch: %s", e)
+
+def _flush_last_used_loop():
+    """Periodically flush queued last_used_at updates"""
+    while True:
+        time.sleep(LAST_USED_FLUSH_INTERVAL)
+        _flush_last_used(_drain_last_used_pending())
+
+# Don't lose the tail of the queue on shutdown
+atexit.register(lambda: _flush_last_used(_drain_last_used_pending()))
+
+# Endpoints marked @require_auth; the session check runs once in the
+# before_request hook below instead of in a wrapper frame per handler
+_session_protected_endpoints = set()
 
 def require_auth(f):
-    """Decorator to require session authentication"""
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if 'user' not in session:
-            return redirect(url_for('login'))
-        return f(*args, **kwargs)
-    return decorated_function
+    """Mark an endpoint as requiring session authentication"""
+    _session_protected_endpoints.add(f.__name__)
+    return f
+
+@app.before_request
+def _enforce_session_auth():
+    """Redirect unauthenticated requests to session-protected endpoints
+
+    Also stashes the session user's id on flask.g so handlers can read
+    g.user_id instead of digging through the session dict repeatedly.
+    """
+    user = session.get('user')
+    if user:
+        g.user_id = user['id']
+    elif request.endpoint in _session_protected_endpoints:
+        return redirect(url_for('login'))
 
 def require_api_auth(f):
     """Decorator to require API token authentication"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
         auth_header = request.headers.get('Authorization', '')
-        
-        if not auth_header.startswith('Bearer '):
+
+        # removeprefix returns the original object when the prefix is
+        # absent, so one scan covers both the check and the slice
+        token = auth_header.removeprefix('Bearer ')
+        if token is auth_header:
             return jsonify({'error': 'Missing or invalid authorization header'}), 401
-        
-        token = auth_header.split(' ')[1]
-        if not token.startswith('jolt_pat_'):
+
+        if not token.startswith('jolt_pat_') or len(token) not in _PAT_LENGTHS:
             return jsonify({'error': 'Invalid token format'}), 401
-        
-        # Verify token in database
+
+
+        # Verify token, via the in-process cache when warm
         token_hash = hash_token(token)
         try:
-            result = supabase.table('personal_access_tokens').select('*').eq('token_hash', token_hash).eq('is_active', True).execute()
-            
-            if not result.data:
+            token_record = _lookup_token_record(token_hash)
+            if token_record is None:
                 return jsonify({'error': 'Invalid or expired token'}), 401
-            
-            token_record = result.data[0]
-            
-            # Check if token is expired
-            if token_record.get('expires_at'):
-                expires_at = datetime.fromisoformat(token_record['expires_at'].replace('Z', '+00:00'))
-                if expires_at < datetime.now(expires_at.tzinfo):
-                    return jsonify({'error': 'Token has expired'}), 401
-            
-            # Update last_used_at
-            supabase.table('personal_access_tokens').update({
-                'last_used_at': datetime.utcnow().isoformat()
-            }).eq('id', token_record['id']).execute()
-            
+
+            # Expiry is a float compare: legacy ISO expires_at values
+            # are parsed once at cache-insert time in _lookup_token_record
+            expires_epoch = token_record.get('expires_at_epoch')
+            if expires_epoch and expires_epoch < time.time():
+                return jsonify({'error': 'Token has expired'}), 401
+
+            # Queue the last_used_at touch for the background flush
+            _record_token_use(token_record['id'])
+
             # Add user info to request context
             request.current_user_id = token_record['user_id']
-            
+
             return f(*args, **kwargs)
-            
+
         except Exception as e:
             return jsonify({'error': 'Token validation failed'}), 401
-    
+
     return decorated_function
 
 def require_token_auth(f):
@@ -136,35 +647,35 @@ def require_token_auth(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         auth_header = request.headers.get('Authorization', '')
-        
-        if not auth_header.startswith('Bearer '):
+
+        # removeprefix returns the original object when the prefix is
+        # absent, so one scan covers both the check and the slice
+        token = auth_header.removeprefix('Bearer ')
+        if token is auth_header:
             return jsonify({'error': 'Missing or invalid authorization header'}), 401
-        
-        token = auth_header.split(' ')[1]
-        if not token.startswith('jolt_pat_'):
+
+        if not token.startswith('jolt_pat_') or len(token) not in _PAT_LENGTHS:
             return jsonify({'error': 'Invalid token format'}), 401
-        
-        # Verify token in database
+
+
+        # Verify token, via the in-process cache when warm
         token_hash = hash_token(token)
         try:
-            result = supabase.table('personal_access_tokens').select('*').eq('token_hash', token_hash).eq('is_active', True).execute()
-            
-            if not result.data:
+            token_record = _lookup_token_record(token_hash)
+            if token_record is None:
                 return jsonify({'error': 'Invalid or expired token'}), 401
+
+
+            # Expiry is a float compare: legacy ISO expires_at values
+            # are parsed once at cache-insert time in _lookup_token_record
+            expires_epoch = token_record.get('expires_at_epoch')
+            if expires_epoch and expires_epoch < time.time():
+                return jsonify({'error': 'Token has expired'}), 401
             
-            token_record = result.data[0]
-            
-            # Check if token is expired
-            if token_record.get('expires_at'):
-                expires_at = datetime.fromisoformat(token_record['expires_at'].replace('Z', '+00:00'))
-                if expires_at < datetime.now(expires_at.tzinfo):
-                    return jsonify({'error': 'Token has expired'}), 401
-            
-            # Update last_used_at
-            supabase.table('personal_access_tokens').update({
-                'last_used_at': datetime.utcnow().isoformat()
-            }).eq('id', token_record['id']).execute()
-            
+            # Queue the last_used_at touch for the background flush
+            _record_token_use(token_record['id'])
+
+
             # Add comprehensive user info to request context
             request.current_user_id = token_record['user_id']
             request.current_user = {
@@ -270,14 +781,10 @@ def signup():
 @app.route('/logout')
 def logout():
     """Logout user"""
-    try:
-        if supabase:
-            supabase.auth.sign_out()
-        session.clear()
-        flash('Logged out successfully', 'success')
-    except Exception as e:
-        flash(f'Logout error: {str(e)}', 'error')
-    
+    # Auth lives in the Flask session, not a Supabase JWT cookie, so
+    # clearing the session is all a logout needs — no GoTrue round-trip
+    session.clear()
+    flash('Logged out successfully', 'success')
     return redirect(url_for('login'))
 
 @app.route('/home')
@@ -285,7 +792,7 @@ def logout():
 def home():
     """Home page - requires authentication"""
     # Check if user has connected Strava
-    user_id = session['user']['id']
+    user_id = g.user_id
     strava_connected = strava_token_manager.is_connected(user_id) if strava_token_manager else False
     
     return render_template('home.html', 
@@ -305,19 +812,40 @@ def strava_connect():
     # Generate a state parameter for security (CSRF protection)
     state = secrets.token_urlsafe(32)
     session['strava_oauth_state'] = state
-    
-    # Build Strava OAuth URL following best practices
-    strava_auth_url = (
-        f"https://www.strava.com/oauth/authorize?"
-        f"client_id={STRAVA_CLIENT_ID}&"
-        f"response_type=code&"
-        f"redirect_uri={STRAVA_REDIRECT_URI}&"
-        f"approval_prompt=auto&"  # Use 'auto' instead of 'force' for better UX
-        f"scope=read,activity:read_all&"  # Request minimal required scopes
-        f"state={state}"  # Add state for CSRF protection
-    )
-    
-    return redirect(strava_auth_url)
+
+    return redirect(f"{STRAVA_AUTH_URL_BASE}&state={state}")
+
+def _exchange_strava_code(user_id, code):
+    """Exchange an OAuth code for tokens and store them, off the request thread"""
+    try:
+        response = strava_request(
+            'POST',
+            "https://www.strava.com/oauth/token",
+            data={
+                'client_id': STRAVA_CLIENT_ID,
+                'client_secret': STRAVA_CLIENT_SECRET,
+                'code': code,
+                'grant_type': 'authorization_code'
+            }
+        )
+        token_response = response.json()
+
+        if response.status_code == 200 and 'access_token' in token_response:
+            if strava_token_manager:
+                if not strava_token_manager.store_credentials(user_id, token_response):
+                    logger.warning("Failed to store Strava credentials for user %s", user_id)
+
+                granted_scopes = token_response.get('scope', '').split(',')
+                missing_scopes = [
+                    scope for scope in ['read', 'activity:read_all']
+                    if scope not in granted_scopes
+                ]
+                if missing_scopes:
+                    logger.warning("Strava scopes not granted for user %s: %s", user_id, ', '.join(missing_scopes))
+        else:
+            logger.warning("Strava token exchange failed: %s", token_response.get('message', 'Unknown error'))
+    except Exception as e:
+        logger.warning("Strava token exchange error: %s", e)
 
 @app.route('/strava/callback')
 def strava_callback():
@@ -346,42 +874,30 @@ def strava_callback():
     # Clear the state from session
     session.pop('strava_oauth_state', None)
     
+    # Run the token exchange in the background so the redirect doesn't
+    # block on Strava's round trip; credentials land in the database and
+    # the home page picks the connection up on its next load
+    threading.Thread(
+        target=_exchange_strava_code,
+        args=(g.user_id, code),
+        daemon=True
+    ).start()
+
+    flash('Strava connection in progress - it will show as connected shortly.', 'info')
+    return redirect(url_for('home', strava='pending'))
+
+def _deauthorize_strava(access_token):
+    """Revoke the app's access on Strava's side, off the request path"""
     try:
-        # Exchange code for access token
-        token_url = "https://www.strava.com/oauth/token"
-        token_data = {
-            'client_id': STRAVA_CLIENT_ID,
-            'client_secret': STRAVA_CLIENT_SECRET,
-            'code': code,
-            'grant_type': 'authorization_code'
-        }
-        
-        response = requests.post(token_url, data=token_data)
-        token_response = response.json()
-        
-        if response.status_code == 200 and 'access_token' in token_response:
-            # Store credentials in database instead of session
-            user_id = session['user']['id']
-            if strava_token_manager and strava_token_manager.store_credentials(user_id, token_response):
-                # Check what scopes were actually granted
-                granted_scopes = token_response.get('scope', '').split(',')
-                required_scopes = ['read', 'activity:read_all']
-                
-                missing_scopes = [scope for scope in required_scopes if scope not in granted_scopes]
-                if missing_scopes:
-                    flash(f'Warning: Some permissions were not granted: {", ".join(missing_scopes)}', 'warning')
-                
-                flash('Strava connected successfully!', 'success')
-            else:
-                flash('Failed to store Strava credentials', 'error')
-        else:
-            error_description = token_response.get('message', 'Unknown error')
-            flash(f'Failed to connect to Strava: {error_description}', 'error')
-            
+        response = strava_request(
+            'POST',
+            'https://www.strava.com/oauth/deauthorize',
+            data={'access_token': access_token}
+        )
+        if response.status_code != 200:
+            logger.warning("Failed to deauthorize on Strava: %s - %s", response.status_code, response.text)
     except Exception as e:
-        flash(f'Strava connection error: {str(e)}', 'error')
-    
-    return redirect(url_for('home'))
+        logger.warning("Strava deauthorize error: %s", e)
 
 @app.route('/strava/disconnect', methods=['POST'])
 @require_auth
@@ -391,37 +907,62 @@ def strava_disconnect():
         flash('Strava token manager not available', 'error')
         return redirect(url_for('home'))
     
-    user_id = session['user']['id']
-    
+    user_id = g.user_id
+
     try:
         # Get current access token
         access_token = strava_token_manager.get_valid_access_token(user_id)
-        
-        if access_token:
-            # Deauthorize on Strava's side
-            deauth_url = "https://www.strava.com/oauth/deauthorize"
-            deauth_data = {'access_token': access_token}
-            
-            response = requests.post(deauth_url, data=deauth_data)
-            
-            if response.status_code != 200:
-                print(f"Failed to deauthorize on Strava: {response.status_code} - {response.text}")
-        
-        # Invalidate credentials in our database regardless of Strava's response
+
+        # Invalidate locally first — that's what the UX depends on; the
+        # Strava-side deauth is best-effort and runs off the request path
         if strava_token_manager.invalidate_credentials(user_id):
             flash('Strava account disconnected successfully', 'success')
         else:
             flash('Failed to disconnect Strava account', 'error')
-            
+
+        if access_token:
+            _background.submit(_deauthorize_strava, access_token)
+
     except Exception as e:
         flash(f'Error disconnecting Strava: {str(e)}', 'error')
-    
+
     return redirect(url_for('home'))
 
 # ============================================================================
 # STRAVA WEBHOOK ENDPOINTS
 # ============================================================================
 
+# Strava requires a fast 200 ACK and retries slow deliveries, so events
+# are queued here and processed by daemon workers off the request path.
+# The queue is bounded: under extreme backlog we drop (and log) rather
+# than let Strava's retries amplify the load.
+WEBHOOK_QUEUE_SIZE = 10_000
+WEBHOOK_WORKERS = 2
+_webhook_queue = queue.Queue(maxsize=WEBHOOK_QUEUE_SIZE)
+_webhook_workers_started = False
+_webhook_workers_lock = threading.Lock()
+
+def _webhook_worker():
+    """Drain queued webhook events through the manager"""
+    while True:
+        event_data = _webhook_queue.get()
+        try:
+            strava_webhook_manager.handle_webhook_event(event_data)
+        except Exception as e:
+            logger.warning("Error processing webhook event: %s", e)
+        finally:
+            _webhook_queue.task_done()
+
+def _ensure_webhook_workers():
+    """Start the worker threads on first use"""
+    global _webhook_workers_started
+    with _webhook_workers_lock:
+        if _webhook_workers_started:
+            return
+        _webhook_workers_started = True
+        for _ in range(WEBHOOK_WORKERS):
+            threading.Thread(target=_webhook_worker, daemon=True).start()
+
 @app.route('/webhooks/strava', methods=['GET', 'POST'])
 def strava_webhook():
     """
@@ -444,20 +985,29 @@ def strava_webhook():
     elif request.method == 'POST':
         # Handle webhook event
         try:
-            event_data = request.get_json()
-            
+            # Parse the raw body with orjson directly (responses already
+            # go through the orjson provider); cache=False skips Werkzeug
+            # buffering a copy of the payload we read exactly once
+            body = request.get_data(cache=False)
+            event_data = orjson.loads(body) if body else None
+
             if not event_data:
                 return jsonify({'error': 'No JSON data received'}), 400
-            
-            # Process the webhook event
-            result = strava_webhook_manager.handle_webhook_event(event_data)
-            
-            # Always return 200 OK to acknowledge receipt (required by Strava)
-            return jsonify(result), 200
-            
+
+            # Queue the event and acknowledge immediately (required by
+            # Strava); the workers process it off the request path
+            _ensure_webhook_workers()
+            try:
+                _webhook_queue.put_nowait(event_data)
+            except queue.Full:
+                logger.warning("Webhook queue full; dropping event for object %s", event_data.get('object_id'))
+
+            return jsonify({'status': 'queued'}), 200
+
+
         except Exception as e:
             # Still return 200 to acknowledge receipt, but log the error
-            print(f"Error processing webhook: {e}")
+            logger.warning("Error processing webhook: %s", e)
             return jsonify({'status': 'error', 'message': str(e)}), 200
 
 # ============================================================================
@@ -560,43 +1110,36 @@ def strava_activities():
         if not access_token:
             return jsonify({'error': 'Strava connection expired. Please reconnect your account.'}), 400
         
-        # Fetch activities from Strava
-        headers = {'Authorization': f'Bearer {access_token}'}
-        activities_url = 'https://www.strava.com/api/v3/athlete/activities'
-        
-        response = requests.get(activities_url, headers=headers, params={'per_page': 20})
-        activities = response.json()
-        
-        if response.status_code == 200:
-            # Enhance each activity with detailed data
-            enhanced_activities = []
-            for activity in activities:
-                enhanced_activity = {
-                    'id': activity['id'],
-                    'name': activity['name'],
-                    'type': activity['type'],
-                    'distance': activity.get('distance', 0),
-                    'moving_time': activity.get('moving_time', 0),
-                    'elapsed_time': activity.get('elapsed_time', 0),
-                    'total_elevation_gain': activity.get('total_elevation_gain', 0),
-                    'start_date': activity['start_date'],
-                    'average_speed': activity.get('average_speed', 0),
-                    'max_speed': activity.get('max_speed', 0),
-                    'average_heartrate': activity.get('average_heartrate'),
-                    'max_heartrate': activity.get('max_heartrate'),
-                    'calories': activity.get('calories'),
-                    'suffer_score': activity.get('suffer_score')
-                }
-                enhanced_activities.append(enhanced_activity)
-            
-            return jsonify({
-                'success': True,
-                'total_activities': len(enhanced_activities),
-                'activities': enhanced_activities
-            })
-        else:
-            return jsonify({'error': f'Failed to fetch activities: {activities}'}), 500
-            
+        # Fetch activities from Strava (served from the TTL cache when warm)
+        activities = fetch_strava_activities(user_id, access_token, per_page=20)
+
+        # Enhance each activity with detailed data
+        enhanced_activities = []
+        for activity in activities:
+            enhanced_activity = {
+                'id': activity['id'],
+                'name': activity['name'],
+                'type': activity['type'],
+                'distance': activity.get('distance', 0),
+                'moving_time': activity.get('moving_time', 0),
+                'elapsed_time': activity.get('elapsed_time', 0),
+                'total_elevation_gain': activity.get('total_elevation_gain', 0),
+                'start_date': activity['start_date'],
+                'average_speed': activity.get('average_speed', 0),
+                'max_speed': activity.get('max_speed', 0),
+                'average_heartrate': activity.get('average_heartrate'),
+                'max_heartrate': activity.get('max_heartrate'),
+                'calories': activity.get('calories'),
+                'suffer_score': activity.get('suffer_score')
+            }
+            enhanced_activities.append(enhanced_activity)
+
+        return jsonify({
+            'success': True,
+            'total_activities': len(enhanced_activities),
+            'activities': enhanced_activities
+        })
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -604,7 +1147,7 @@ def strava_activities():
 @require_auth
 def strava_activities_legacy():
     """Get Strava activities as JSON (Legacy session-based)"""
-    user_id = session['user']['id']
+    user_id = g.user_id
     if not strava_token_manager or not strava_token_manager.is_connected(user_id):
         return jsonify({'error': 'Strava account not connected'}), 400
     
@@ -615,43 +1158,243 @@ def strava_activities_legacy():
             flash('Strava connection expired. Please reconnect your account.', 'error')
             return redirect(url_for('home'))
         
-        # Fetch activities from Strava
+        # Fetch activities from Strava (served from the TTL cache when warm)
         headers = {'Authorization': f'Bearer {access_token}'}
-        activities_url = 'https://www.strava.com/api/v3/athlete/activities'
-        
-        response = requests.get(activities_url, headers=headers, params={'per_page': 20})
-        activities = response.json()
-        
-        if response.status_code == 200:
-            # Enhance each activity with detailed data
-            enhanced_activities = []
-            for activity in activities:
-                enhanced_activity = enhance_activity_data(activity, headers)
-                enhanced_activities.append(enhanced_activity)
-            
-            return jsonify({
-                'success': True,
-                'total_activities': len(enhanced_activities),
-                'activities': enhanced_activities
-            })
-        else:
-            return jsonify({'error': 'Failed to fetch activities from Strava'}), 500
-            
+        activities = fetch_strava_activities(user_id, access_token, per_page=20)
+
+        # Enhance activities concurrently: each enhancement is an
+        # independent pair of Strava round trips over the pooled session.
+        # Enhancement mutates its argument, so work on copies — the list
+        # itself lives in the activities cache and is shared across
+        # requests and endpoints.
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            enhanced_activities = list(executor.map(
+                lambda activity: enhance_activity_data(dict(activity), headers),
+                activities
+            ))
+
+        # Warm the next page's caches off the request path
+        _schedule_activity_prefetch(user_id, access_token)
+
+        return jsonify({
+            'success': True,
+            'total_activities': len(enhanced_activities),
+            'activities': enhanced_activities
+        })
+
     except Exception as e:
         return jsonify({'error': f'Error fetching activities: {str(e)}'}), 500
 
+# Finalized Strava activities are immutable, so their detail and stream
+# payloads cache aggressively: 36 hours in Redis when configured (shared
+# across workers and restarts), otherwise in-process. Warm entries spare
+# both the round trip and the Strava rate-limit budget.
+ACTIVITY_DETAIL_TTL = 36 * 3600  # seconds
+ACTIVITY_CACHE_MAX = 512  # entries; streams payloads run to megabytes
+_activity_http_cache = OrderedDict()  # key -> (cached_at, payload); in-process fallback
+_activity_http_lock = threading.Lock()
+_activity_cache_stats = {'hits': 0, 'misses': 0}  # approximate, unlocked
+
+def _activity_cache_get(key):
+    """Look up a cached activity payload; None on miss"""
+    if redis_client is not None:
+        try:
+            cached = redis_client.get(key)
+            if cached is not None:
+                _activity_cache_stats['hits'] += 1
+                return orjson.loads(cached)
+        except Exception as e:
+            logger.warning("Redis activity cache read failed: %s", e)
+    else:
+        with _activity_http_lock:
+            entry = _activity_http_cache.get(key)
+            if entry and time.time() - entry[0] < ACTIVITY_DETAIL_TTL:
+                _activity_http_cache.move_to_end(key)
+                _activity_cache_stats['hits'] += 1
+                return entry[1]
+    _activity_cache_stats['misses'] += 1
+    return None
+
+def _activity_cache_set(key, payload):
+    """Store an activity payload under the 36-hour TTL"""
+    if redis_client is not None:
+        try:
+            redis_client.setex(
+                key, ACTIVITY_DETAIL_TTL,
+                orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+            )
+        except Exception as e:
+            logger.warning("Redis activity cache write failed: %s", e)
+    else:
+        _cache_put(_activity_http_cache, _activity_http_lock, key,
+                   (time.time(), payload), ACTIVITY_CACHE_MAX)
+
+# In-flight detail fetches keyed by cache key: concurrent requests for
+# the same uncached activity wait on the first fetch instead of each
+# paying its own upstream call.
+_detail_inflight = {}
+_detail_inflight_lock = threading.Lock()
+
+def fetch_activity_detail(activity_id, headers):
+    """Fetch one activity's detail payload through the shared cache
+
+    Returns the decoded payload, or None when Strava answers non-200.
+    Concurrent misses for the same id coalesce into a single upstream
+    request; followers block until the leader has populated the cache.
+    """
+    key = f"strava:activity:{activity_id}:detail"
+    while True:
+        cached = _activity_cache_get(key)
+        if cached is not None:
+            return cached
+        with _detail_inflight_lock:
+            waiter = _detail_inflight.get(key)
+            if waiter is None:
+                _detail_inflight[key] = threading.Event()
+                break
+        # Another request is already fetching this activity; when it
+        # finishes the cache probe above will hit. A stalled leader
+        # times out and the follower fetches for itself.
+        if not waiter.wait(timeout=HTTP_TIMEOUT[1]):
+            break
+
+    try:
+        response = strava_request(
+            'GET',
+            f'https://www.strava.com/api/v3/activities/{activity_id}',
+            headers=headers
+        )
+        if response.status_code != 200:
+            return None
+        payload = orjson.loads(response.content)
+        _activity_cache_set(key, payload)
+        return payload
+    finally:
+        with _detail_inflight_lock:
+            event = _detail_inflight.pop(key, None)
+        if event is not None:
+            event.set()
+
+# Streams that fit in int16; everything else numeric narrows to float32
+_INT16_STREAMS = ('heartrate', 'cadence', 'temp')
+
+def _narrow_streams(streams_data):
+    """Convert numeric stream buffers to narrow NumPy dtypes in place
+
+    A Python list of ints for a one-hour ride is roughly 30x the
+    footprint of an int16 buffer. The zone/split math downstream is
+    vectorized anyway, and the orjson provider serializes arrays
+    natively on the way out.
+    """
+    import numpy as np  # deferred with the rest of the analytics stack
+
+    for key, stream in streams_data.items():
+        data = stream.get('data') if isinstance(stream, dict) else None
+        # Only plain lists: an already-narrowed ndarray (warm in-process
+        # cache hit) must be skipped, and truth-testing it would raise
+        if not isinstance(data, list) or not data:
+            continue
+        first = data[0]
+        # bools (the 'moving' stream) and latlng pairs stay as-is
+        if isinstance(first, bool) or not isinstance(first, (int, float)):
+            continue
+        dtype = np.int16 if key in _INT16_STREAMS else np.float32
+        stream['data'] = np.asarray(data, dtype=dtype)
+
 def enhance_activity_data(activity, headers):
-    """Enhance activity with additional detailed data"""
+    """Enhance activity with additional detailed data
+
+    Detail and stream payloads come from the activity cache when warm.
+    On a cold cache the two endpoints are independent, so the detail
+    call runs on a worker while this thread fetches streams: wall time
+    per activity is the slower of the two round trips, not their sum.
+    """
     activity_id = activity['id']
-    
+
+    detailed_activity = _activity_cache_get(f"strava:activity:{activity_id}:detail")
+    streams_data = _activity_cache_get(f"strava:activity:{activity_id}:streams")
+
+    detail_future = None
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        if detailed_activity is None:
+            detail_url = f'https://www.strava.com/api/v3/activities/{activity_id}'
+            detail_future = pool.submit(strava_request, 'GET', detail_url, headers=headers)
+
+        # Try to get activity streams (mile splits, heart rate data,
+        # etc.) — but shed them first when the Strava budget runs low:
+        # the basic activity fields still render without streams
+        if streams_data is None and _strava_budget_tight():
+            logger.debug("Skipping stream fetch for activity %s: Strava budget tight", activity_id)
+        elif streams_data is None:
+            try:
+                streams_url = f'https://www.strava.com/api/v3/activities/{activity_id}/streams'
+                streams_response = strava_request('GET', streams_url, headers=headers, stream=True, params={
+                    'keys': 'time,distance,latlng,altitude,heartrate,temp,moving,grade_smooth,velocity_smooth,cadence,watts',
+                    'key_by_type': 'true'
+                })
+
+                if streams_response.status_code == 200:
+                    if ijson is not None:
+                        # Incremental parse: the raw JSON text never
+                        # coexists in memory with the decoded arrays,
+                        # which matters for dense multi-hour streams.
+                        # use_float keeps numbers as float rather than
+                        # ijson's default Decimal, which orjson refuses
+                        # to serialize and _narrow_streams would skip.
+                        streams_response.raw.decode_content = True
+                        streams_data = dict(
+                            ijson.kvitems(streams_response.raw, '', use_float=True)
+                        )
+                    else:
+                        streams_data = streams_response.json()
+                    # Narrow before caching: the in-process cache holds
+                    # this dict by reference, so it must already be in
+                    # its final form when it goes in (the Redis path
+                    # serializes arrays fine either way)
+                    _narrow_streams(streams_data)
+                    _activity_cache_set(f"strava:activity:{activity_id}:streams", streams_data)
+
+            except Exception as e:
+                logger.warning("Could not fetch streams for activity %s: %s", activity_id, e)
+                activity['streams'] = None
+
+    if streams_data is not None:
+        # No-op on in-process hits (already narrowed); converts the
+        # plain lists that come back from a Redis hit
+        _narrow_streams(streams_data)
+        activity['streams'] = streams_data
+
+        # Process splits data if available
+        if 'distance' in streams_data and 'time' in streams_data:
+            activity['mile_splits'] = calculate_mile_splits(
+                streams_data['distance']['data'],
+                streams_data['time']['data']
+            )
+
+        # Process heart rate data if available
+        if 'heartrate' in streams_data:
+            hr_data = streams_data['heartrate']['data']
+            if len(hr_data):
+                activity['hr_stats'] = {
+                    'avg_hr': float(hr_data.mean()),
+                    'max_hr': int(hr_data.max()),
+                    'min_hr': int(hr_data.min()),
+                    'hr_zones': calculate_hr_zones(hr_data)
+                }
+            else:
+                activity['hr_stats'] = {
+                    'avg_hr': None, 'max_hr': None, 'min_hr': None, 'hr_zones': None
+                }
+
     try:
-        # Get detailed activity data
-        detail_url = f'https://www.strava.com/api/v3/activities/{activity_id}'
-        detail_response = requests.get(detail_url, headers=headers)
-        
-        if detail_response.status_code == 200:
-            detailed_activity = detail_response.json()
-            
+        if detail_future is not None:
+            detail_response = detail_future.result()
+
+            if detail_response.status_code == 200:
+                detailed_activity = detail_response.json()
+                _activity_cache_set(f"strava:activity:{activity_id}:detail", detailed_activity)
+
+        if detailed_activity is not None:
             # Merge detailed data with basic activity data
             activity.update({
                 'detailed': detailed_activity,
@@ -675,117 +1418,180 @@ def enhance_activity_data(activity, headers):
                 'splits_metric': detailed_activity.get('splits_metric', []),
                 'laps': detailed_activity.get('laps', [])
             })
-        
-        # Try to get activity streams (mile splits, heart rate data, etc.)
-        try:
-            streams_url = f'https://www.strava.com/api/v3/activities/{activity_id}/streams'
-            streams_response = requests.get(streams_url, headers=headers, params={
-                'keys': 'time,distance,latlng,altitude,heartrate,temp,moving,grade_smooth,velocity_smooth,cadence,watts',
-                'key_by_type': 'true'
-            })
-            
-            if streams_response.status_code == 200:
-                streams_data = streams_response.json()
-                activity['streams'] = streams_data
-                
-                # Process splits data if available
-                if 'distance' in streams_data and 'time' in streams_data:
-                    activity['mile_splits'] = calculate_mile_splits(
-                        streams_data['distance']['data'], 
-                        streams_data['time']['data']
-                    )
-                    
-                # Process heart rate data if available
-                if 'heartrate' in streams_data:
-                    hr_data = streams_data['heartrate']['data']
-                    activity['hr_stats'] = {
-                        'avg_hr': sum(hr_data) / len(hr_data) if hr_data else None,
-                        'max_hr': max(hr_data) if hr_data else None,
-                        'min_hr': min(hr_data) if hr_data else None,
-                        'hr_zones': calculate_hr_zones(hr_data) if hr_data else None
-                    }
-                    
-        except Exception as e:
-            print(f"Could not fetch streams for activity {activity_id}: {e}")
-            activity['streams'] = None
-            
+
     except Exception as e:
-        print(f"Could not enhance activity {activity_id}: {e}")
-    
+        logger.warning("Could not enhance activity %s: %s", activity_id, e)
+
     return activity
 
+# Speculative prefetch: after serving page 1 of activities, warm the
+# detail/stream cache for page 2 in the background so a scroll hits
+# warm cache. Debounced per user so repeated page loads don't stack
+# duplicate warmups (which would also eat Strava budget).
+PREFETCH_DEBOUNCE_TTL = 300  # seconds
+PREFETCH_LAST_MAX = 10_000  # users
+_prefetch_last = OrderedDict()  # user_id -> last prefetch timestamp
+_prefetch_last_lock = threading.Lock()
+
+def _prefetch_activity_page(user_id, access_token, page):
+    """Warm the activity caches for a follow-up page"""
+    try:
+        activities = fetch_strava_activities(user_id, access_token, per_page=20, page=page)
+        headers = {'Authorization': f'Bearer {access_token}'}
+        for activity in activities:
+            # Work on a copy: enhancement mutates the dict, and the
+            # activity list itself is cached
+            enhance_activity_data(dict(activity), headers)
+    except Exception as e:
+        logger.debug("Prefetch of activities page %s failed for user %s: %s", page, user_id, e)
+
+def _schedule_activity_prefetch(user_id, access_token, page=2):
+    """Queue a background warmup of the next activities page, debounced"""
+    now = time.time()
+    with _prefetch_last_lock:
+        last = _prefetch_last.get(user_id)
+        if last and now - last < PREFETCH_DEBOUNCE_TTL:
+            return
+    _cache_put(_prefetch_last, _prefetch_last_lock, user_id, now, PREFETCH_LAST_MAX)
+    _background.submit(_prefetch_activity_page, user_id, access_token, page)
+
 def calculate_mile_splits(distance_data, time_data):
-    """Calculate mile splits from distance and time streams"""
-    if not distance_data or not time_data:
+    """Calculate mile splits from distance and time streams
+
+    Binary-searches the distance stream for the first sample at or past
+    each whole-mile mark. The old modulo scan only caught samples within
+    100m past a mark, so it skipped miles when samples were sparse and
+    re-tested every sample in Python.
+    """
+    # len-based checks: the streams may be lists or NumPy buffers
+    if distance_data is None or len(distance_data) == 0:
         return []
-    
-    splits = []
+    if time_data is None or len(time_data) == 0:
+        return []
+
+    import numpy as np  # deferred with the rest of the analytics stack
+
     mile_meters = 1609.34  # 1 mile in meters
-    
-    for i, distance in enumerate(distance_data):
-        if distance > 0 and distance % mile_meters < 100:  # Within 100m of a mile
-            mile_number = int(distance / mile_meters)
-            if mile_number > 0 and mile_number > len(splits):
-                time_at_mile = time_data[i] if i < len(time_data) else time_data[-1]
-                splits.append({
-                    'mile': mile_number,
-                    'time': time_at_mile,
-                    'pace': time_at_mile / mile_number if mile_number > 0 else 0
-                })
-    
-    return splits
+
+    d = np.asarray(distance_data, dtype=np.float64)
+    t = np.asarray(time_data, dtype=np.float64)
+
+    targets = np.arange(mile_meters, d[-1], mile_meters)
+    if targets.size == 0:
+        return []
+
+    idx = np.clip(np.searchsorted(d, targets), 0, t.size - 1)
+    times = t[idx]
+    miles = np.arange(1, targets.size + 1)
+    paces = times / miles
+
+    return [
+        {'mile': int(mile), 'time': float(time_at_mile), 'pace': float(pace)}
+        for mile, time_at_mile, pace in zip(miles, times, paces)
+    ]
 
 def calculate_hr_zones(hr_data):
     """Calculate heart rate zones (simplified)"""
-    if not hr_data:
+    # len-based check: hr_data may be a list or a NumPy buffer
+    if hr_data is None or len(hr_data) == 0:
         return None
-    
-    avg_hr = sum(hr_data) / len(hr_data)
-    max_hr = max(hr_data)
-    
-    # Simple HR zone calculation (you might want to use actual max HR)
-    zones = {
-        'zone_1': sum(1 for hr in hr_data if hr < avg_hr * 0.7),
-        'zone_2': sum(1 for hr in hr_data if avg_hr * 0.7 <= hr < avg_hr * 0.8),
-        'zone_3': sum(1 for hr in hr_data if avg_hr * 0.8 <= hr < avg_hr * 0.9),
-        'zone_4': sum(1 for hr in hr_data if avg_hr * 0.9 <= hr < max_hr * 0.95),
-        'zone_5': sum(1 for hr in hr_data if hr >= max_hr * 0.95)
+
+    import numpy as np  # deferred with the rest of the analytics stack
+
+    arr = np.asarray(hr_data, dtype=np.float32)
+    avg_hr = float(arr.mean())
+    max_hr = float(arr.max())
+
+    # Same zone edges as the old per-zone comparisons; searchsorted bins
+    # the whole stream in one branchless C pass (side='right' keeps the
+    # inclusive lower bounds) and bincount tallies the zones
+    edges = np.array([avg_hr * 0.7, avg_hr * 0.8, avg_hr * 0.9, max_hr * 0.95], dtype=np.float32)
+    counts = np.bincount(np.searchsorted(edges, arr, side='right'), minlength=5)
+
+    return {
+        'zone_1': int(counts[0]),
+        'zone_2': int(counts[1]),
+        'zone_3': int(counts[2]),
+        'zone_4': int(counts[3]),
+        'zone_5': int(counts[4])
     }
-    
-    return zones
 
 # CalorieNinjas Integration Functions
+
+# Nutrition lookups cache by normalized meal text: phrases like
+# "chicken breast" recur across users and CalorieNinjas' answer for
+# them doesn't change, so a warm entry skips the API round-trip
+NUTRITION_CACHE_TTL = 7 * 86400  # seconds
+NUTRITION_CACHE_MAX = 2048  # entries
+_nutrition_cache = OrderedDict()  # key -> (cached_at, payload); in-process fallback
+_nutrition_cache_lock = threading.Lock()
+
+def _nutrition_cache_get(key):
+    """Look up a cached nutrition analysis; None on miss"""
+    if redis_client is not None:
+        try:
+            cached = redis_client.get(key)
+            if cached is not None:
+                return orjson.loads(cached)
+        except Exception as e:
+            logger.warning("Redis nutrition cache read failed: %s", e)
+    else:
+        with _nutrition_cache_lock:
+            entry = _nutrition_cache.get(key)
+            if entry and time.time() - entry[0] < NUTRITION_CACHE_TTL:
+                _nutrition_cache.move_to_end(key)
+                return entry[1]
+    return None
+
+def _nutrition_cache_set(key, payload):
+    """Store a nutrition analysis under the 7-day TTL"""
+    if redis_client is not None:
+        try:
+            redis_client.setex(key, NUTRITION_CACHE_TTL, orjson.dumps(payload))
+        except Exception as e:
+            logger.warning("Redis nutrition cache write failed: %s", e)
+    else:
+        _cache_put(_nutrition_cache, _nutrition_cache_lock, key,
+                   (time.time(), payload), NUTRITION_CACHE_MAX)
+
 def analyze_meal_with_calorie_ninjas(meal_description):
     """Analyze meal description using CalorieNinjas API"""
     if not CALORIE_NINJAS_API_KEY:
-        print(f"DEBUG: CALORIE_NINJAS_API_KEY is: {CALORIE_NINJAS_API_KEY}")
-        print(f"DEBUG: Environment variable CALORIE_NINJAS_API_KEY: {os.getenv('CALORIE_NINJAS_API_KEY')}")
+        logger.debug("CALORIE_NINJAS_API_KEY is: %s", CALORIE_NINJAS_API_KEY)
+        logger.debug("Environment variable CALORIE_NINJAS_API_KEY: %s", os.getenv('CALORIE_NINJAS_API_KEY'))
         raise ValueError("CalorieNinjas API key not configured")
-    
-    headers = {
-        'X-Api-Key': CALORIE_NINJAS_API_KEY
-    }
-    
+
+    cache_key = f"cn:{hashlib.sha256(meal_description.lower().strip().encode()).hexdigest()}"
+    cached = _nutrition_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
     try:
-        # URL encode the query
-        import urllib.parse
-        encoded_query = urllib.parse.quote(meal_description)
-        url = f"{CALORIE_NINJAS_API_URL}?query={encoded_query}"
-        
-        response = requests.get(url, headers=headers)
+        # params handles the query encoding; the pooled session keeps
+        # the TLS connection to CalorieNinjas warm between meals
+        response = cn_http.get(
+            CALORIE_NINJAS_API_URL,
+            headers=CN_HEADERS,
+            params={'query': meal_description},
+            timeout=HTTP_TIMEOUT
+        )
         response.raise_for_status()
         
         result = response.json()
         
         if 'items' in result and result['items']:
-            # Aggregate all items into a single meal
-            total_calories = sum(item.get('calories', 0) for item in result['items'])
-            total_carbs = sum(item.get('carbohydrates_total_g', 0) for item in result['items'])
-            total_fats = sum(item.get('fat_total_g', 0) for item in result['items'])
-            total_protein = sum(item.get('protein_g', 0) for item in result['items'])
-            total_sodium = sum(item.get('sodium_mg', 0) for item in result['items'])
-            total_fiber = sum(item.get('fiber_g', 0) for item in result['items'])
-            total_sugar = sum(item.get('sugar_g', 0) for item in result['items'])
+            # Aggregate all items into a single meal in one pass instead
+            # of seven generator sweeps over the item list
+            total_calories = total_carbs = total_fats = 0.0
+            total_protein = total_sodium = total_fiber = total_sugar = 0.0
+            for item in result['items']:
+                total_calories += item.get('calories', 0)
+                total_carbs += item.get('carbohydrates_total_g', 0)
+                total_fats += item.get('fat_total_g', 0)
+                total_protein += item.get('protein_g', 0)
+                total_sodium += item.get('sodium_mg', 0)
+                total_fiber += item.get('fiber_g', 0)
+                total_sugar += item.get('sugar_g', 0)
             
             # Create meal name from first few items
             item_names = [item.get('name', 'Unknown') for item in result['items'][:3]]
@@ -793,7 +1599,7 @@ def analyze_meal_with_calorie_ninjas(meal_description):
             if len(result['items']) > 3:
                 meal_name += f" and {len(result['items']) - 3} more items"
             
-            return {
+            analysis = {
                 'name': meal_name,
                 'calories': round(total_calories, 1),
                 'carbs': round(total_carbs, 1),
@@ -804,75 +1610,58 @@ def analyze_meal_with_calorie_ninjas(meal_description):
                 'sugar': round(total_sugar, 1),
                 'ingredients': result['items'],
                 'health_recommendations': generate_health_recommendations(
-                    total_calories, total_carbs, total_fats, total_protein, 
+                    total_calories, total_carbs, total_fats, total_protein,
                     total_sodium, total_fiber, total_sugar
                 )
             }
+            _nutrition_cache_set(cache_key, analysis)
+            return analysis
         else:
             raise ValueError("No nutritional data found for the meal description")
             
     except requests.exceptions.RequestException as e:
         raise ValueError(f"Failed to call CalorieNinjas API: {str(e)}")
 
-def generate_health_recommendations(calories, carbs, fats, protein, sodium, fiber, sugar):
-    """Generate health recommendations based on nutritional data"""
-    recommendations = []
-    
+# Health recommendation rules, built once at import: (predicate, message)
+# pairs evaluated against the nutrient dict below, in the original order
+_HEALTH_RULES = (
     # Calorie recommendations
-    if calories > 800:
-        recommendations.append("Consider reducing portion size - this meal is quite high in calories")
-    elif calories < 200:
-        recommendations.append("This meal is quite low in calories - consider adding more nutrient-dense foods")
-    
+    (lambda n: n['calories'] > 800, "Consider reducing portion size - this meal is quite high in calories"),
+    (lambda n: n['calories'] < 200, "This meal is quite low in calories - consider adding more nutrient-dense foods"),
     # Protein recommendations
-    if protein < 15:
-        recommendations.append("Add more protein sources like lean meat, fish, beans, or Greek yogurt")
-    elif protein > 50:
-        recommendations.append("High protein content - great for muscle building and satiety!")
-    
+    (lambda n: n['protein'] < 15, "Add more protein sources like lean meat, fish, beans, or Greek yogurt"),
+    (lambda n: n['protein'] > 50, "High protein content - great for muscle building and satiety!"),
     # Fat recommendations
-    if fats > 30:
-        recommendations.append("Consider reducing saturated fats and opting for healthier fats like olive oil or avocado")
-    elif fats < 5:
-        recommendations.append("Add healthy fats like nuts, seeds, or olive oil for better nutrient absorption")
-    
+    (lambda n: n['fats'] > 30, "Consider reducing saturated fats and opting for healthier fats like olive oil or avocado"),
+    (lambda n: n['fats'] < 5, "Add healthy fats like nuts, seeds, or olive oil for better nutrient absorption"),
     # Carbohydrate recommendations
-    if carbs > 80:
-        recommendations.append("High carb content - consider balancing with more protein and vegetables")
-    elif carbs < 20:
-        recommendations.append("Low carb content - add some whole grains or fruits for energy")
-    
+    (lambda n: n['carbs'] > 80, "High carb content - consider balancing with more protein and vegetables"),
+    (lambda n: n['carbs'] < 20, "Low carb content - add some whole grains or fruits for energy"),
     # Fiber recommendations
-    if fiber < 5:
-        recommendations.append("Add more fiber-rich foods like vegetables, fruits, or whole grains")
-    elif fiber > 15:
-        recommendations.append("Excellent fiber content - great for digestive health!")
-    
+    (lambda n: n['fiber'] < 5, "Add more fiber-rich foods like vegetables, fruits, or whole grains"),
+    (lambda n: n['fiber'] > 15, "Excellent fiber content - great for digestive health!"),
     # Sodium recommendations
-    if sodium > 1000:
-        recommendations.append("High sodium content - consider reducing salt and processed foods")
-    elif sodium < 200:
-        recommendations.append("Low sodium content - good for heart health")
-    
+    (lambda n: n['sodium'] > 1000, "High sodium content - consider reducing salt and processed foods"),
+    (lambda n: n['sodium'] < 200, "Low sodium content - good for heart health"),
     # Sugar recommendations
-    if sugar > 25:
-        recommendations.append("High sugar content - consider reducing added sugars and processed foods")
-    elif sugar < 5:
-        recommendations.append("Low sugar content - great choice for stable energy")
-    
+    (lambda n: n['sugar'] > 25, "High sugar content - consider reducing added sugars and processed foods"),
+    (lambda n: n['sugar'] < 5, "Low sugar content - great choice for stable energy"),
     # Macro balance recommendations
-    protein_percentage = (protein * 4 / calories * 100) if calories > 0 else 0
-    carb_percentage = (carbs * 4 / calories * 100) if calories > 0 else 0
-    fat_percentage = (fats * 9 / calories * 100) if calories > 0 else 0
-    
-    if protein_percentage < 15:
-        recommendations.append("Increase protein to 15-25% of total calories for better muscle health")
-    if carb_percentage > 70:
-        recommendations.append("Consider reducing carbs and increasing protein and healthy fats")
-    if fat_percentage < 20:
-        recommendations.append("Add healthy fats to reach 20-35% of total calories")
-    
-    return recommendations
+    (lambda n: n['protein_pct'] < 15, "Increase protein to 15-25% of total calories for better muscle health"),
+    (lambda n: n['carb_pct'] > 70, "Consider reducing carbs and increasing protein and healthy fats"),
+    (lambda n: n['fat_pct'] < 20, "Add healthy fats to reach 20-35% of total calories"),
+)
+
+def generate_health_recommendations(calories, carbs, fats, protein, sodium, fiber, sugar):
+    """Generate health recommendations based on nutritional data"""
+    nutrients = {
+        'calories': calories, 'carbs': carbs, 'fats': fats, 'protein': protein,
+        'sodium': sodium, 'fiber': fiber, 'sugar': sugar,
+        'protein_pct': (protein * 4 / calories * 100) if calories > 0 else 0,
+        'carb_pct': (carbs * 4 / calories * 100) if calories > 0 else 0,
+        'fat_pct': (fats * 9 / calories * 100) if calories > 0 else 0,
+    }
+    return [message for predicate, message in _HEALTH_RULES if predicate(nutrients)]
 
 def save_meal_to_supabase(meal_data, user_id):
     """Save analyzed meal data to Supabase meals table"""
@@ -895,75 +1684,139 @@ def save_meal_to_supabase(meal_data, user_id):
     except Exception as e:
         raise ValueError(f"Failed to save meal to database: {str(e)}")
 
+def _day_bounds(start_date, end_date):
+    """ISO timestamps covering [start_date, end_date] as whole days
+
+    Formatted directly from the dates: cheaper than building two
+    datetime objects per day just to call isoformat on them.
+    """
+    return f"{start_date.isoformat()}T00:00:00", f"{end_date.isoformat()}T23:59:59.999999"
+
+def get_meals_range(user_id, start_iso, end_iso):
+    """Fetch all of a user's meals between two ISO timestamps in one query"""
+    result = supabase.table('meals').select('*').eq('user_id', user_id).gte(
+        'created_at', start_iso
+    ).lte('created_at', end_iso).execute()
+    return result.data if result.data else []
+
+def _summarize_day(date, meals):
+    """Build the daily nutrition summary dict from a day's meal rows"""
+    # Calculate totals
+    total_calories = sum(meal.get('calories', 0) for meal in meals)
+    total_carbs = sum(meal.get('carbs', 0) for meal in meals)
+    total_fats = sum(meal.get('fats', 0) for meal in meals)
+    total_protein = sum(meal.get('protein', 0) for meal in meals)
+
+    # Calculate macro percentages
+    total_macros = total_carbs + total_fats + total_protein
+    if total_macros > 0:
+        carb_percentage = (total_carbs * 4 / total_calories * 100) if total_calories > 0 else 0
+        fat_percentage = (total_fats * 9 / total_calories * 100) if total_calories > 0 else 0
+        protein_percentage = (total_protein * 4 / total_calories * 100) if total_calories > 0 else 0
+    else:
+        carb_percentage = fat_percentage = protein_percentage = 0
+
+    return {
+        'date': date.isoformat(),
+        'total_meals': len(meals),
+        'total_calories': total_calories,
+        'total_carbs': total_carbs,
+        'total_fats': total_fats,
+        'total_protein': total_protein,
+        'macro_breakdown': {
+            'carbs_percentage': round(carb_percentage, 1),
+            'fats_percentage': round(fat_percentage, 1),
+            'protein_percentage': round(protein_percentage, 1)
+        },
+        'meals': meals
+    }
+
 def get_daily_nutrition_summary(user_id, date=None):
     """Get daily nutrition summary for a user"""
     if not date:
         date = datetime.now().date()
-    
+
     try:
         # Get meals for the specified date
-        start_date = datetime.combine(date, datetime.min.time())
-        end_date = datetime.combine(date, datetime.max.time())
-        
-        result = supabase.table('meals').select('*').eq('user_id', user_id).gte('created_at', start_date.isoformat()).lte('created_at', end_date.isoformat()).execute()
-        
-        meals = result.data if result.data else []
-        
-        # Calculate totals
-        total_calories = sum(meal.get('calories', 0) for meal in meals)
-        total_carbs = sum(meal.get('carbs', 0) for meal in meals)
-        total_fats = sum(meal.get('fats', 0) for meal in meals)
-        total_protein = sum(meal.get('protein', 0) for meal in meals)
-        
-        # Calculate macro percentages
-        total_macros = total_carbs + total_fats + total_protein
-        if total_macros > 0:
-            carb_percentage = (total_carbs * 4 / total_calories * 100) if total_calories > 0 else 0
-            fat_percentage = (total_fats * 9 / total_calories * 100) if total_calories > 0 else 0
-            protein_percentage = (total_protein * 4 / total_calories * 100) if total_calories > 0 else 0
-        else:
-            carb_percentage = fat_percentage = protein_percentage = 0
-        
-        return {
-            'date': date.isoformat(),
-            'total_meals': len(meals),
-            'total_calories': total_calories,
-            'total_carbs': total_carbs,
-            'total_fats': total_fats,
-            'total_protein': total_protein,
-            'macro_breakdown': {
-                'carbs_percentage': round(carb_percentage, 1),
-                'fats_percentage': round(fat_percentage, 1),
-                'protein_percentage': round(protein_percentage, 1)
-            },
-            'meals': meals
-        }
-        
+        meals = get_meals_range(user_id, *_day_bounds(date, date))
+        return _summarize_day(date, meals)
+
     except Exception as e:
         raise ValueError(f"Failed to get nutrition summary: {str(e)}")
 
 def get_nutrition_trends(user_id, days=7):
-    """Get nutrition trends over specified days"""
+    """Get nutrition trends over specified days
+
+    One ranged query covers the whole window; rows are bucketed by day
+    in Python instead of issuing a round-trip per day.
+    """
     try:
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=days-1)
-        
+
+        meals = get_meals_range(user_id, *_day_bounds(start_date, end_date))
+
+        by_day = {}
+        for meal in meals:
+            by_day.setdefault(meal.get('created_at', '')[:10], []).append(meal)
+
         trends = []
         for i in range(days):
             current_date = start_date + timedelta(days=i)
-            daily_summary = get_daily_nutrition_summary(user_id, current_date)
-            trends.append(daily_summary)
-        
+            trends.append(_summarize_day(current_date, by_day.get(current_date.isoformat(), [])))
+
         return trends
-        
+
     except Exception as e:
         raise ValueError(f"Failed to get nutrition trends: {str(e)}")
 
-def analyze_meal_patterns(user_id, days=30):
-    """Analyze meal patterns and provide insights over time"""
+def get_daily_totals(user_id, days):
+    """Per-day nutrition totals aggregated inside Postgres
+
+    The daily_nutrition RPC ships one SUM/COUNT row per day instead of
+    every meal row in the window; falls back to the ranged fetch plus
+    Python grouping where migration 010 isn't applied. Days without
+    meals come back zero-filled, like get_nutrition_trends.
+    """
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=days-1)
+
+    start_iso, end_iso = _day_bounds(start_date, end_date)
     try:
-        trends = get_nutrition_trends(user_id, days)
-        
+        result = supabase.rpc('daily_nutrition', {
+            'p_user_id': user_id,
+            'p_start': start_iso,
+            'p_end': end_iso
+        }).execute()
+    except Exception:
+        return get_nutrition_trends(user_id, days)
+
+    by_day = {row['day']: row for row in (result.data or [])}
+    totals = []
+    for i in range(days):
+        day = (start_date + timedelta(days=i)).isoformat()
+        row = by_day.get(day)
+        totals.append({
+            'date': day,
+            'total_meals': int(row['total_meals']) if row else 0,
+            'total_calories': float(row['total_calories']) if row else 0,
+            'total_carbs': float(row['total_carbs']) if row else 0,
+            'total_fats': float(row['total_fats']) if row else 0,
+            'total_protein': float(row['total_protein']) if row else 0
+        })
+    return totals
+
+def analyze_meal_patterns(user_id, days=30, trends=None):
+    """Analyze meal patterns and provide insights over time
+
+    Callers that already hold the trend window (get_meal_insights) pass
+    it in so the meals aren't re-queried; otherwise only the per-day
+    totals are pulled, aggregated by the database.
+    """
+    try:
+        if trends is None:
+            trends = get_daily_totals(user_id, days)
+
         if not trends:
             return {
                 'insights': [],
@@ -971,17 +1824,25 @@ def analyze_meal_patterns(user_id, days=30):
                 'recommendations': ['Start logging meals to get personalized insights!']
             }
         
-        # Calculate averages and trends
+        import numpy as np  # deferred with the rest of the analytics stack
+
+        # Daily totals as one matrix: the averages and consistency
+        # variances drop out of two vectorized reductions instead of
+        # eight separate Python sweeps over the trend list
+        daily = np.array(
+            [[day['total_calories'], day['total_protein'], day['total_carbs'],
+              day['total_fats'], day['total_meals']] for day in trends],
+            dtype=np.float64
+        )
         total_days = len(trends)
-        avg_calories = sum(day['total_calories'] for day in trends) / total_days
-        avg_protein = sum(day['total_protein'] for day in trends) / total_days
-        avg_carbs = sum(day['total_carbs'] for day in trends) / total_days
-        avg_fats = sum(day['total_fats'] for day in trends) / total_days
-        
-        # Calculate consistency metrics
-        calorie_variance = statistics.variance([day['total_calories'] for day in trends]) if total_days > 1 else 0
-        protein_variance = statistics.variance([day['total_protein'] for day in trends]) if total_days > 1 else 0
-        
+        avg_calories, avg_protein, avg_carbs, avg_fats, avg_meals_per_day = daily.mean(axis=0)
+
+        # Calculate consistency metrics (sample variance, like statistics.variance)
+        if total_days > 1:
+            calorie_variance, protein_variance = daily[:, :2].var(axis=0, ddof=1)
+        else:
+            calorie_variance = protein_variance = 0
+
         # Analyze patterns
         insights = []
         patterns = {}
@@ -1016,9 +1877,6 @@ def analyze_meal_patterns(user_id, days=30):
             insights.append("Good consistency in daily calorie intake")
         
         # Meal frequency analysis
-        total_meals = sum(day['total_meals'] for day in trends)
-        avg_meals_per_day = total_meals / total_days
-        
         if avg_meals_per_day < 2:
             insights.append(f"Low meal frequency ({avg_meals_per_day:.1f} meals/day)")
             recommendations.append("Consider adding healthy snacks between meals")
@@ -1077,9 +1935,9 @@ def get_meal_insights(user_id, days=30):
     try:
         # Get basic trends
         trends = get_nutrition_trends(user_id, days)
-        
-        # Get pattern analysis
-        pattern_analysis = analyze_meal_patterns(user_id, days)
+
+        # Get pattern analysis over the same window without re-querying
+        pattern_analysis = analyze_meal_patterns(user_id, days, trends=trends)
         
         # Calculate weekly patterns
         weekly_patterns = {}
@@ -1132,22 +1990,25 @@ def comprehensive_analytics():
         headers = {'Authorization': f'Bearer {access_token}'}
         
         # Create analytics engine
-        analytics = AdvancedAnalyticsEngine(headers)
-        
+        analytics = _analytics_engine(headers)
+
         # Get comprehensive insights for the specified period
-        insights = analytics.get_comprehensive_insights(days=days)
-        
+        insights = _cached_insights(
+            (user_id, 'insights', days),
+            lambda: analytics.get_comprehensive_insights(days=days)
+        )
+
         # Convert insights to JSON-serializable format
         analytics_data = {
             'success': True,
             'analysis_period': f'{days} days',
-            'training_load': insights.training_load.__dict__ if insights.training_load else {},
-            'intensity_zones': insights.intensity_zones.__dict__ if insights.intensity_zones else {},
-            'performance_curves': insights.performance_curves.__dict__ if insights.performance_curves else {},
-            'volume_trends': insights.volume_trends.__dict__ if insights.volume_trends else {},
-            'consistency': insights.consistency.__dict__ if insights.consistency else {},
-            'terrain_analysis': insights.terrain_analysis.__dict__ if insights.terrain_analysis else {},
-            'cadence_analysis': insights.cadence_analysis.__dict__ if insights.cadence_analysis else {},
+            'training_load': asdict(insights.training_load) if insights.training_load else {},
+            'intensity_zones': asdict(insights.intensity_distribution) if insights.intensity_distribution else {},
+            'performance_curves': asdict(insights.performance_curve) if insights.performance_curve else {},
+            'volume_trends': insights.volume_trends or {},
+            'consistency': insights.consistency_metrics or {},
+            'terrain_analysis': insights.terrain_analysis or {},
+            'cadence_analysis': insights.cadence_analysis or {},
             'wellness_score': insights.wellness_score,
             'readiness_score': insights.readiness_score,
             'recommendations': insights.recommendations
@@ -1164,13 +2025,15 @@ def wellness_tracking():
     if 'user' not in session:
         return redirect(url_for('login'))
     
-    user_id = session['user']['id']
+    user_id = g.user_id
     if not strava_token_manager or not strava_token_manager.is_connected(user_id):
         flash('Please connect your Strava account first', 'error')
         return redirect(url_for('home'))
     
     if request.method == 'POST':
         try:
+            from analytics_engine import WellnessMetrics
+
             # Get wellness data from form
             wellness_data = WellnessMetrics(
                 mood=int(request.form.get('mood', 3)),
@@ -1205,7 +2068,7 @@ def wellness_insights():
     if 'user' not in session:
         return redirect(url_for('login'))
     
-    user_id = session['user']['id']
+    user_id = g.user_id
     if not strava_token_manager or not strava_token_manager.is_connected(user_id):
         flash('Please connect your Strava account first', 'error')
         return redirect(url_for('home'))
@@ -1217,8 +2080,10 @@ def wellness_insights():
             return redirect(url_for('home'))
         
         headers = {'Authorization': f'Bearer {access_token}'}
-        analytics = AdvancedAnalyticsEngine(headers)
-        
+        analytics = _analytics_engine(headers)
+
+        from analytics_engine import WellnessMetrics
+
         # Get wellness data from session
         wellness_dict = session.get('wellness_data', {})
         wellness_data = WellnessMetrics(
@@ -1230,8 +2095,13 @@ def wellness_insights():
             perceived_effort=wellness_dict.get('perceived_effort')
         ) if wellness_dict else None
         
-        # Get comprehensive insights with wellness data
-        insights = analytics.get_comprehensive_insights(days=30, wellness_data=wellness_data)
+        # Get comprehensive insights with wellness data; the wellness
+        # values join the cache key so edits don't serve stale insights
+        wellness_key = tuple(sorted(wellness_dict.items())) if wellness_dict else None
+        insights = _cached_insights(
+            (user_id, 'insights', 30, wellness_key),
+            lambda: analytics.get_comprehensive_insights(days=30, wellness_data=wellness_data)
+        )
         
         return render_template('wellness_insights.html', insights=insights, wellness_data=wellness_data)
         
@@ -1261,11 +2131,14 @@ def api_analytics_summary():
             return redirect(url_for('home'))
         
         headers = {'Authorization': f'Bearer {access_token}'}
-        analytics = AdvancedAnalyticsEngine(headers)
-        
+        analytics = _analytics_engine(headers)
+
         # Get insights for the specified period
-        insights = analytics.get_comprehensive_insights(days=days)
-        
+        insights = _cached_insights(
+            (user_id, 'insights', days),
+            lambda: analytics.get_comprehensive_insights(days=days)
+        )
+
         # Convert to JSON-serializable format
         summary = {
             'training_load': {
@@ -1302,65 +2175,45 @@ def api_performance_trends():
             flash('Strava connection expired. Please reconnect your account.', 'error')
             return redirect(url_for('home'))
         
-        headers = {'Authorization': f'Bearer {access_token}'}
-        
-        # Get activities for last 3 months
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=90)
-        start_timestamp = int(start_date.timestamp())
-        
-        activities_url = 'https://www.strava.com/api/v3/athlete/activities'
-        response = requests.get(activities_url, headers=headers, params={
-            'after': start_timestamp,
-            'per_page': 200
-        })
-        
-        if response.status_code != 200:
+        # Get activities for last 3 months. Midnight-aligning 'after'
+        # keeps the cache key stable across requests on the same day, so
+        # every trends call after the first is served from cache.
+        start_date = (datetime.now() - timedelta(days=90)).replace(
+            hour=0, minute=0, second=0, microsecond=0)
+        try:
+            activities = fetch_strava_activities_all(
+                user_id, access_token,
+                after=int(start_date.timestamp()), per_page=200
+            )
+        except (requests.RequestException, StravaRateLimited):
             return jsonify({'error': 'Failed to fetch activities'}), 500
         
-        activities = response.json()
-        
-        # Process trends
+        # Process trends columnar: pull each metric into an array once
+        # and do the unit math vectorized instead of per-activity Python
+        # arithmetic. Missing/zero values become NaN and are dropped when
+        # the series is materialized, matching the old truthiness checks.
+        import numpy as np
+
+        runs = [a for a in activities if a.get('type') == 'Run']
+        dates = [a['start_date_local'][:10] for a in runs]
+
+        def column(field):
+            return np.array([a.get(field) or np.nan for a in runs], dtype=np.float64)
+
+        def series(values):
+            return [
+                {'date': date, 'value': float(value)}
+                for date, value in zip(dates, values)
+                if not np.isnan(value)
+            ]
+
         trends = {
-            'pace_trend': [],
-            'heart_rate_trend': [],
-            'distance_trend': [],
-            'elevation_trend': []
+            'pace_trend': series(np.round(column('average_speed') * 3.6 / 60, 2)),  # km/min
+            'heart_rate_trend': series(column('average_heartrate')),
+            'distance_trend': series(np.round(column('distance') / 1000, 2)),  # km
+            'elevation_trend': series(column('total_elevation_gain'))
         }
-        
-        for activity in activities:
-            if activity.get('type') == 'Run':
-                date = activity['start_date_local'][:10]
-                
-                # Pace trend
-                if activity.get('average_speed'):
-                    pace_km_per_min = activity['average_speed'] * 3.6 / 60  # km/min
-                    trends['pace_trend'].append({
-                        'date': date,
-                        'value': round(pace_km_per_min, 2)
-                    })
-                
-                # Heart rate trend
-                if activity.get('average_heartrate'):
-                    trends['heart_rate_trend'].append({
-                        'date': date,
-                        'value': activity['average_heartrate']
-                    })
-                
-                # Distance trend
-                if activity.get('distance'):
-                    trends['distance_trend'].append({
-                        'date': date,
-                        'value': round(activity['distance'] / 1000, 2)  # km
-                    })
-                
-                # Elevation trend
-                if activity.get('total_elevation_gain'):
-                    trends['elevation_trend'].append({
-                        'date': date,
-                        'value': activity['total_elevation_gain']
-                    })
-        
+
         return jsonify(trends)
         
     except Exception as e:
@@ -1388,22 +2241,27 @@ def psychology_analysis():
             return redirect(url_for('home'))
         
         headers = {'Authorization': f'Bearer {access_token}'}
-        psychology_engine = PerformancePsychologyEngine(headers)
+        psychology_engine = _psychology_engine(headers, user_id, access_token)
         
         # Get comprehensive psychology analysis for the specified period
-        analysis = psychology_engine.analyze_performance_psychology(days=days)
+        analysis = _cached_insights(
+            (user_id, 'psychology', days),
+            lambda: psychology_engine.analyze_performance_psychology(days=days)
+        )
         
-        # Convert analysis to JSON-serializable format
+        # The engine returns a dict whose values are dataclass lists;
+        # the orjson provider serializes those natively, so they pass
+        # straight through without per-event __dict__ copies
         psychology_data = {
             'success': True,
-            'analysis_period': f'{days} days',
-            'performance_events': [event.__dict__ for event in analysis.performance_events] if analysis.performance_events else [],
-            'wellness_insights': analysis.wellness_insights,
-            'psychological_patterns': analysis.psychological_patterns,
-            'recommendations': analysis.recommendations,
-            'summary': analysis.summary
+            'analysis_period': analysis['analysis_period'],
+            'performance_events': analysis['performance_events'],
+            'wellness_trends': analysis['wellness_trends'],
+            'correlations': analysis['correlations'],
+            'psychological_insights': analysis['psychological_insights'],
+            'recommendations': analysis['recommendations']
         }
-        
+
         return jsonify(psychology_data)
         
     except Exception as e:
@@ -1416,7 +2274,7 @@ def submit_wellness_psychology():
         return jsonify({'error': 'Not authenticated'}), 401
     
     try:
-        user_id = session['user']['id']
+        user_id = g.user_id
         wellness_data = request.get_json()
         
         access_token = get_user_strava_token(user_id)
@@ -1425,11 +2283,12 @@ def submit_wellness_psychology():
             return redirect(url_for('home'))
         
         headers = {'Authorization': f'Bearer {access_token}'}
-        psychology_engine = PerformancePsychologyEngine(headers)
+        psychology_engine = _psychology_engine(headers, user_id, access_token)
         
         success = psychology_engine.submit_wellness_data(wellness_data)
-        
+
         if success:
+            _invalidate_insights(user_id)
             return jsonify({'status': 'success', 'message': 'Wellness data submitted for psychology analysis'})
         else:
             return jsonify({'status': 'error', 'message': 'Failed to submit wellness data'}), 500
@@ -1452,7 +2311,7 @@ def api_performance_events():
             return redirect(url_for('home'))
             
         headers = {'Authorization': f'Bearer {access_token}'}
-        psychology_engine = PerformancePsychologyEngine(headers)
+        psychology_engine = _psychology_engine(headers, user_id, access_token)
         
         # Get time period from query parameter (default to 7 days)
         days = request.args.get('days', 7, type=int)
@@ -1499,47 +2358,58 @@ def api_split_analysis(activity_id):
         access_token = get_user_strava_token(user_id)
         if not access_token:
             flash('Strava connection expired. Please reconnect your account.', 'error')
-        return redirect(url_for('home'))
+            return redirect(url_for('home'))
 
         headers = {'Authorization': f'Bearer {access_token}'}
-        
-        # Get detailed activity data
-        response = requests.get(
-            f'https://www.strava.com/api/v3/activities/{activity_id}',
-            headers=headers
-        )
-        
-        if response.status_code != 200:
+
+        # Get detailed activity data through the shared cache; concurrent
+        # requests for the same activity coalesce into one upstream call
+        activity = fetch_activity_detail(activity_id, headers)
+
+        if activity is None:
             return jsonify({'error': 'Failed to fetch activity'}), 500
-        
-        activity = response.json()
-        
+
         # Analyze splits
         splits_analysis = {}
         if 'splits_metric' in activity and activity['splits_metric']:
+            import numpy as np
+
             splits = activity['splits_metric']
-            split_times = [split['moving_time'] for split in splits]
-            
-            # Calculate split degradation
+            split_times = np.fromiter(
+                (split['moving_time'] for split in splits),
+                dtype=np.float64, count=len(splits)
+            )
+
+            # Calculate split degradation. Prefix sums give every
+            # early-half average in one pass instead of re-averaging a
+            # growing prefix per split (O(n^2) -> O(n)).
             degradation_analysis = []
-            for i in range(2, len(split_times)):
-                early_avg = statistics.mean(split_times[:i//2])
-                current_split = split_times[i]
-                degradation_pct = ((current_split - early_avg) / early_avg) * 100
-                
-                degradation_analysis.append({
-                    'split_number': i + 1,
-                    'split_time': current_split,
-                    'degradation_pct': degradation_pct,
-                    'psychological_impact': 'high' if degradation_pct > 15 else 'moderate' if degradation_pct > 8 else 'low'
-                })
-            
+            significant_degradation = False
+            if len(split_times) > 2:
+                cumsum = np.cumsum(split_times)
+                idx = np.arange(2, len(split_times))
+                half = idx // 2
+                early_avg = cumsum[half - 1] / half
+                degradation_pct = (split_times[idx] - early_avg) / early_avg * 100
+
+                degradation_analysis = [
+                    {
+                        'split_number': int(i) + 1,
+                        'split_time': float(split_times[i]),
+                        'degradation_pct': float(pct),
+                        'psychological_impact': 'high' if pct > 15 else 'moderate' if pct > 8 else 'low'
+                    }
+                    for i, pct in zip(idx, degradation_pct)
+                ]
+                significant_degradation = bool((degradation_pct > 15).any())
+
+            mean_time = float(split_times.mean())
             splits_analysis = {
                 'total_splits': len(splits),
-                'average_split_time': statistics.mean(split_times),
-                'split_consistency': 1 - (statistics.stdev(split_times) / statistics.mean(split_times)) if len(split_times) > 1 else 1,
+                'average_split_time': mean_time,
+                'split_consistency': 1 - float(split_times.std(ddof=1)) / mean_time if len(split_times) > 1 else 1,
                 'degradation_analysis': degradation_analysis,
-                'significant_degradation': any(d['degradation_pct'] > 15 for d in degradation_analysis)
+                'significant_degradation': significant_degradation
             }
         
         return jsonify({
@@ -1574,7 +2444,7 @@ def api_psychology_insights():
             return redirect(url_for('home'))
         
         headers = {'Authorization': f'Bearer {access_token}'}
-        psychology_engine = PerformancePsychologyEngine(headers)
+        psychology_engine = _psychology_engine(headers, user_id, access_token)
         
         # Get time period from query parameter (default to 30 days)
         days = request.args.get('days', 30, type=int)
@@ -1584,13 +2454,35 @@ def api_psychology_insights():
             days = 30  # Default fallback
         
         # Get psychology summary for the specified period
-        summary = psychology_engine.get_psychology_summary(days=days)
+        summary = _cached_insights(
+            (user_id, 'psychology_summary', days),
+            lambda: psychology_engine.get_psychology_summary(days=days)
+        )
         
         return jsonify(summary)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# One validation pass shared by both wellness submission endpoints
+_WELLNESS_REQUIRED = ('mood', 'stress', 'motivation')
+_WELLNESS_SCALE_FIELDS = ('mood', 'stress', 'motivation', 'sleep_quality',
+                          'soreness', 'perceived_effort')
+
+def _validate_wellness_payload(wellness_data):
+    """Check a wellness submission; returns an error message or None"""
+    if not wellness_data:
+        return 'No wellness data provided'
+    for field in _WELLNESS_REQUIRED:
+        if field not in wellness_data:
+            return f'Missing required field: {field}'
+    for field in _WELLNESS_SCALE_FIELDS:
+        if field in wellness_data:
+            value = wellness_data[field]
+            if not isinstance(value, (int, float)) or value < 1 or value > 10:
+                return f'{field} must be a number between 1-10'
+    return None
+
 @app.route('/api/psychology/submit-wellness', methods=['POST'])
 @require_token_auth
 def submit_wellness_data():
@@ -1603,33 +2495,22 @@ def submit_wellness_data():
         # Get wellness data from request
         wellness_data = request.get_json()
         
-        if not wellness_data:
-            return jsonify({'error': 'No wellness data provided'}), 400
-        
-        # Validate required fields
-        required_fields = ['mood', 'stress', 'motivation']
-        for field in required_fields:
-            if field not in wellness_data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-        
-        # Validate field values (should be 1-10 scale)
-        for field in ['mood', 'stress', 'motivation', 'sleep_quality', 'soreness', 'perceived_effort']:
-            if field in wellness_data:
-                value = wellness_data[field]
-                if not isinstance(value, (int, float)) or value < 1 or value > 10:
-                    return jsonify({'error': f'{field} must be a number between 1-10'}), 400
+        error = _validate_wellness_payload(wellness_data)
+        if error:
+            return jsonify({'error': error}), 400
         
         access_token = get_user_strava_token(user_id)
         if not access_token:
             return jsonify({'error': 'Strava connection expired'}), 400
         
         headers = {'Authorization': f'Bearer {access_token}'}
-        psychology_engine = PerformancePsychologyEngine(headers)
+        psychology_engine = _psychology_engine(headers, user_id, access_token)
         
         # Submit wellness data
         success = psychology_engine.submit_wellness_data(wellness_data)
-        
+
         if success:
+            _invalidate_insights(user_id)
             return jsonify({
                 'success': True,
                 'message': 'Wellness data submitted successfully',
@@ -1653,35 +2534,25 @@ def analyze_feelings():
         # Get wellness data from request
         wellness_data = request.get_json()
         
-        if not wellness_data:
-            return jsonify({'error': 'No wellness data provided'}), 400
-        
-        # Validate required fields
-        required_fields = ['mood', 'stress', 'motivation']
-        for field in required_fields:
-            if field not in wellness_data:
-                return jsonify({'error': f'Missing required field: {field}'}), 400
-        
-        # Validate field values (should be 1-10 scale)
-        for field in ['mood', 'stress', 'motivation', 'sleep_quality', 'soreness', 'perceived_effort']:
-            if field in wellness_data:
-                value = wellness_data[field]
-                if not isinstance(value, (int, float)) or value < 1 or value > 10:
-                    return jsonify({'error': f'{field} must be a number between 1-10'}), 400
+        error = _validate_wellness_payload(wellness_data)
+        if error:
+            return jsonify({'error': error}), 400
         
         access_token = get_user_strava_token(user_id)
         if not access_token:
             return jsonify({'error': 'Strava connection expired'}), 400
         
         headers = {'Authorization': f'Bearer {access_token}'}
-        psychology_engine = PerformancePsychologyEngine(headers)
+        psychology_engine = _psychology_engine(headers, user_id, access_token)
         
         # Submit wellness data first
         wellness_success = psychology_engine.submit_wellness_data(wellness_data)
-        
+
         if not wellness_success:
             return jsonify({'error': 'Failed to submit wellness data'}), 500
-        
+
+        _invalidate_insights(user_id)
+
         # Get time period from query parameter (default to 7 days for recent analysis)
         days = request.args.get('days', 7, type=int)
         valid_periods = [7, 14, 30, 60, 90]
@@ -1787,7 +2658,7 @@ def analyze_feelings():
 def api_token():
     """Display user's personal access token"""
     try:
-        result = supabase.table('personal_access_tokens').select('id, last_used_at, expires_at, created_at, is_active').eq('user_id', session['user']['id']).single().execute()
+        result = supabase.table('personal_access_tokens').select('id, last_used_at, expires_at, created_at, is_active').eq('user_id', g.user_id).single().execute()
         
         token_data = result.data if result.data else None
         return render_template('api_token.html', token=token_data)
@@ -1805,29 +2676,26 @@ def generate_api_token():
         token = generate_pat()
         token_hash = hash_token(token)
         
-        # Calculate expiration (1 year from now)
-        expires_at = datetime.utcnow() + timedelta(days=365)
-        
-        # Check if user already has a token
-        existing_result = supabase.table('personal_access_tokens').select('id').eq('user_id', session['user']['id']).execute()
-        
-        if existing_result.data:
-            # Update existing token
-            result = supabase.table('personal_access_tokens').update({
-                'token_hash': token_hash,
-                'expires_at': expires_at.isoformat(),
-                'created_at': datetime.utcnow().isoformat(),
-                'last_used_at': None,
-                'is_active': True
-            }).eq('user_id', session['user']['id']).execute()
-        else:
-            # Create new token
-            result = supabase.table('personal_access_tokens').insert({
-                'user_id': session['user']['id'],
-                'token_hash': token_hash,
-                'expires_at': expires_at.isoformat()
-            }).execute()
-        
+        # Calculate expiration (1 year from now); the epoch twin is what
+        # the auth decorators compare against
+        expires_at = datetime.now(timezone.utc) + timedelta(days=365)
+        expires_at_epoch = int(time.time()) + 365 * 24 * 3600
+        
+        # One upsert on the user_id constraint replaces the
+        # SELECT-then-UPDATE/INSERT pair of round trips
+        result = supabase.table('personal_access_tokens').upsert({
+            'user_id': g.user_id,
+            'token_hash': token_hash,
+            'expires_at': expires_at.isoformat(),
+            'expires_at_epoch': expires_at_epoch,
+            'created_at': now_iso(),
+            'last_used_at': None,
+            'is_active': True
+        }, on_conflict='user_id').execute()
+
+        # The rotated-out token may still sit in the auth cache
+        _invalidate_user_tokens(g.user_id)
+
         if result.data:
             # Show token to user (only time they'll see it)
             return render_template('token_generated.html', token=token)
@@ -1846,9 +2714,13 @@ def revoke_api_token():
     try:
         result = supabase.table('personal_access_tokens').update({
             'is_active': False
-        }).eq('user_id', session['user']['id']).execute()
+        }).eq('user_id', g.user_id).execute()
         
         if result.data:
+            _invalidate_user_tokens(
+                g.user_id,
+                [row['token_hash'] for row in result.data if row.get('token_hash')]
+            )
             flash('API token revoked successfully', 'success')
         else:
             flash('No active token found', 'error')
@@ -1935,7 +2807,7 @@ def api_email():
 def api_get_token():
     """Get current token status via API (requires session auth)"""
     try:
-        result = supabase.table('personal_access_tokens').select('id, last_used_at, expires_at, created_at, is_active').eq('user_id', session['user']['id']).single().execute()
+        result = supabase.table('personal_access_tokens').select('id, last_used_at, expires_at, created_at, is_active').eq('user_id', g.user_id).single().execute()
         
         if result.data:
             token_data = result.data
@@ -1971,29 +2843,26 @@ def api_generate_token():
         token = generate_pat()
         token_hash = hash_token(token)
         
-        # Calculate expiration (1 year from now)
-        expires_at = datetime.utcnow() + timedelta(days=365)
-        
-        # Check if user already has a token
-        existing_result = supabase.table('personal_access_tokens').select('id').eq('user_id', session['user']['id']).execute()
-        
-        if existing_result.data:
-            # Update existing token
-            result = supabase.table('personal_access_tokens').update({
-                'token_hash': token_hash,
-                'expires_at': expires_at.isoformat(),
-                'created_at': datetime.utcnow().isoformat(),
-                'last_used_at': None,
-                'is_active': True
-            }).eq('user_id', session['user']['id']).execute()
-        else:
-            # Create new token
-            result = supabase.table('personal_access_tokens').insert({
-                'user_id': session['user']['id'],
-                'token_hash': token_hash,
-                'expires_at': expires_at.isoformat()
-            }).execute()
-        
+        # Calculate expiration (1 year from now); the epoch twin is what
+        # the auth decorators compare against
+        expires_at = datetime.now(timezone.utc) + timedelta(days=365)
+        expires_at_epoch = int(time.time()) + 365 * 24 * 3600
+        
+        # One upsert on the user_id constraint replaces the
+        # SELECT-then-UPDATE/INSERT pair of round trips
+        result = supabase.table('personal_access_tokens').upsert({
+            'user_id': g.user_id,
+            'token_hash': token_hash,
+            'expires_at': expires_at.isoformat(),
+            'expires_at_epoch': expires_at_epoch,
+            'created_at': now_iso(),
+            'last_used_at': None,
+            'is_active': True
+        }, on_conflict='user_id').execute()
+
+        # The rotated-out token may still sit in the auth cache
+        _invalidate_user_tokens(g.user_id)
+
         if result.data:
             return jsonify({
                 'success': True,
@@ -2021,9 +2890,13 @@ def api_revoke_token():
     try:
         result = supabase.table('personal_access_tokens').update({
             'is_active': False
-        }).eq('user_id', session['user']['id']).execute()
+        }).eq('user_id', g.user_id).execute()
         
         if result.data:
+            _invalidate_user_tokens(
+                g.user_id,
+                [row['token_hash'] for row in result.data if row.get('token_hash')]
+            )
             return jsonify({
                 'success': True,
                 'message': 'Token revoked successfully'
@@ -2048,7 +2921,7 @@ def api_revoke_token():
 @require_auth
 def poke_settings():
     """Poke API key management page"""
-    user_id = session['user']['id']
+    user_id = g.user_id
     
     try:
         # Import Poke credentials manager
@@ -2096,7 +2969,7 @@ def poke_settings():
 @require_auth
 def save_poke_key():
     """Save user's Poke API key"""
-    user_id = session['user']['id']
+    user_id = g.user_id
     poke_api_key = request.form.get('poke_api_key', '').strip()
     
     if not poke_api_key:
@@ -2135,7 +3008,7 @@ def save_poke_key():
 @require_auth
 def remove_poke_key():
     """Remove user's Poke API key"""
-    user_id = session['user']['id']
+    user_id = g.user_id
     
     try:
         # Import Poke credentials manager
@@ -2159,7 +3032,7 @@ def remove_poke_key():
 @require_auth
 def test_poke_key():
     """Test user's current Poke API key"""
-    user_id = session['user']['id']
+    user_id = g.user_id
     
     try:
         # Import managers
@@ -2211,7 +3084,7 @@ def log_meal():
             meal_data = analyze_meal_with_calorie_ninjas(meal_description)
             
             # Save to Supabase
-            user_id = session['user']['id']
+            user_id = g.user_id
             saved_meal = save_meal_to_supabase(meal_data, user_id)
             
             if saved_meal:
@@ -2946,14 +3819,11 @@ def get_sleep_dashboard():
 
 if __name__ == '__main__':
     # Debug: Check if CalorieNinjas API key is loaded
-    print(f"DEBUG: CalorieNinjas API Key loaded: {'Yes' if CALORIE_NINJAS_API_KEY else 'No'}")
-    if CALORIE_NINJAS_API_KEY:
-        print(f"DEBUG: API Key starts with: {CALORIE_NINJAS_API_KEY[:10]}...")
-    else:
-        print("WARNING: CalorieNinjas API key not found in environment variables")
-    
-    print("🚀 Starting Jolt with webhook-based Strava integration")
-    print("✅ No more polling - webhooks provide real-time notifications!")
+    logger.debug("CalorieNinjas API Key loaded: %s", 'Yes' if CALORIE_NINJAS_API_KEY else 'No')
+    if not CALORIE_NINJAS_API_KEY:
+        logger.warning("CalorieNinjas API key not found in environment variables")
+
+    logger.info("Starting Jolt with webhook-based Strava integration")
     
     # Run the Flask app
     app.run(debug=True, port=5001)
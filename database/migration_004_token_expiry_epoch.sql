@@ -0,0 +1,13 @@
+-- Token Expiry Epoch Migration
+-- Run this in your Supabase SQL Editor
+
+-- Store token expiry as a unix timestamp so the API auth path can compare
+-- it against time.time() directly instead of parsing the ISO column on
+-- every request. The expires_at column is kept for the UI.
+ALTER TABLE personal_access_tokens
+    ADD COLUMN IF NOT EXISTS expires_at_epoch BIGINT;
+
+-- Backfill from the existing ISO column
+UPDATE personal_access_tokens
+SET expires_at_epoch = EXTRACT(EPOCH FROM expires_at)::BIGINT
+WHERE expires_at IS NOT NULL AND expires_at_epoch IS NULL;
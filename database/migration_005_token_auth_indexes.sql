@@ -0,0 +1,16 @@
+-- Token Auth Indexes Migration
+-- Run this in your Supabase SQL Editor
+
+-- Partial index covering the auth-path lookup
+-- (token_hash + is_active = TRUE); stays tiny because revoked rows are
+-- excluded. CONCURRENTLY avoids locking the table during creation.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS pat_hash_active_idx
+    ON personal_access_tokens (token_hash)
+    WHERE is_active;
+
+-- One active token per user: turns the existing-token check in the
+-- token-generation routes into a single-row index probe, and is the
+-- conflict target for upserting on rotation
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS pat_user_active_idx
+    ON personal_access_tokens (user_id)
+    WHERE is_active;
@@ -0,0 +1,16 @@
+-- Token User Uniqueness Migration
+-- Run this in your Supabase SQL Editor
+
+-- The app rotates tokens in place, so each user should own exactly one
+-- row. Deduplicate any historical extras (keeping the newest) and add a
+-- full unique constraint so ON CONFLICT (user_id) upserts can target it.
+-- The ctid comparison breaks created_at ties deterministically; without
+-- it, tied duplicates all survive and the constraint below fails.
+DELETE FROM personal_access_tokens p
+USING personal_access_tokens q
+WHERE p.user_id = q.user_id
+  AND (p.created_at < q.created_at
+       OR (p.created_at = q.created_at AND p.ctid < q.ctid));
+
+ALTER TABLE personal_access_tokens
+    ADD CONSTRAINT pat_user_unique UNIQUE (user_id);
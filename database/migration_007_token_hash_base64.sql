@@ -0,0 +1,10 @@
+-- Token Hash Base64 Migration
+-- Run this in your Supabase SQL Editor
+
+-- Stored token hashes move from hex (64 chars) to base64 (44 chars) of
+-- the same SHA-256 digest, matching the new hash_token encoding. The
+-- hex and base64 forms encode identical bytes, so existing tokens keep
+-- working after this one-shot conversion.
+UPDATE personal_access_tokens
+SET token_hash = encode(decode(token_hash, 'hex'), 'base64')
+WHERE token_hash ~ '^[0-9a-f]{64}$';
@@ -0,0 +1,20 @@
+-- Verify PAT RPC Migration
+-- Run this in your Supabase SQL Editor
+
+-- Validate a token hash and touch last_used_at in one statement: the
+-- cold path of API auth was a SELECT followed by an UPDATE (two
+-- round-trips); this collapses them into a single indexed UPDATE and
+-- removes the read-modify-write window between them. Expiry uses the
+-- epoch column so the comparison stays index-friendly.
+CREATE OR REPLACE FUNCTION verify_pat(p_hash text)
+RETURNS SETOF personal_access_tokens
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+    UPDATE personal_access_tokens
+       SET last_used_at = now()
+     WHERE token_hash = p_hash
+       AND is_active
+       AND (expires_at_epoch IS NULL OR expires_at_epoch > extract(epoch FROM now()))
+    RETURNING *;
+$$;
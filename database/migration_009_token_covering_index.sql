@@ -0,0 +1,12 @@
+-- Token Covering Index Migration
+-- Run this in your Supabase SQL Editor
+
+-- Widen the auth-path index to cover every column the fallback lookup
+-- selects, so the probe can be served index-only without touching the
+-- heap. Replaces pat_hash_active_idx from migration 005.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS pat_hash_covering_idx
+    ON personal_access_tokens (token_hash)
+    INCLUDE (id, user_id, expires_at, expires_at_epoch)
+    WHERE is_active;
+
+DROP INDEX CONCURRENTLY IF EXISTS pat_hash_active_idx;
@@ -0,0 +1,29 @@
+-- Daily Nutrition RPC Migration
+-- Run this in your Supabase SQL Editor
+
+-- Aggregate meals per day inside Postgres: pattern analysis only needs
+-- one totals row per day, so summing in the database ships ~30 rows
+-- for a month instead of every meal row in the window.
+CREATE OR REPLACE FUNCTION daily_nutrition(p_user_id uuid, p_start timestamptz, p_end timestamptz)
+RETURNS TABLE(
+    day date,
+    total_meals bigint,
+    total_calories numeric,
+    total_carbs numeric,
+    total_fats numeric,
+    total_protein numeric
+)
+LANGUAGE sql
+AS $$
+    SELECT date_trunc('day', created_at)::date AS day,
+           COUNT(*) AS total_meals,
+           COALESCE(SUM(calories), 0) AS total_calories,
+           COALESCE(SUM(carbs), 0) AS total_carbs,
+           COALESCE(SUM(fats), 0) AS total_fats,
+           COALESCE(SUM(protein), 0) AS total_protein
+      FROM meals
+     WHERE user_id = p_user_id
+       AND created_at BETWEEN p_start AND p_end
+     GROUP BY 1
+     ORDER BY 1;
+$$;
@@ -0,0 +1,13 @@
+"""
+Gunicorn configuration for production deploys
+
+gevent workers monkey-patch the stdlib, so the blocking Strava/Supabase
+HTTP calls yield to other requests instead of pinning a worker for the
+full round trip.
+"""
+
+import multiprocessing
+
+worker_class = 'gevent'
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_connections = 1000
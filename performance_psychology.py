@@ -5,12 +5,21 @@ to provide psychological insights and recommendations.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import statistics
 import json
 
+# Module-level pooled session: engines are built per request, so a
+# per-instance session would never reuse a connection. Headers are
+# passed per call, keeping the pool shareable across users.
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=50))
+
+_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+
 
 @dataclass
 class PerformanceEvent:
@@ -52,8 +61,11 @@ class PerformancePsychologyEngine:
     objective Strava data with subjective wellness metrics
     """
     
-    def __init__(self, headers):
+    def __init__(self, headers, activities_fetcher=None):
         self.headers = headers
+        # Optional shared fetcher for /athlete/activities (the app wires
+        # in its cached one); falls back to a direct API call when unset
+        self.activities_fetcher = activities_fetcher
         self.wellness_history = []  # Store historical wellness data
     
     def analyze_performance_psychology(self, days: int = 30) -> Dict:
@@ -99,23 +111,33 @@ class PerformancePsychologyEngine:
     def _get_recent_activities(self, days: int) -> List[Dict]:
         """Get recent activities with detailed data"""
         end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+        # Midnight-aligned so a shared cache key stays stable within a day
+        start_date = (end_date - timedelta(days=days)).replace(
+            hour=0, minute=0, second=0, microsecond=0)
         start_timestamp = int(start_date.timestamp())
-        
-        response = requests.get(
-            'https://www.strava.com/api/v3/athlete/activities',
-            headers=self.headers,
-            params={
-                'after': start_timestamp,
-                'per_page': 200
-            }
-        )
-        
-        if response.status_code != 200:
-            print(f"❌ Failed to fetch activities: {response.status_code}")
-            return []
-        
-        activities = response.json()
+
+        if self.activities_fetcher is not None:
+            try:
+                activities = self.activities_fetcher(after=start_timestamp, per_page=200)
+            except Exception as e:
+                print(f"❌ Failed to fetch activities: {e}")
+                return []
+        else:
+            response = _session.get(
+                'https://www.strava.com/api/v3/athlete/activities',
+                headers=self.headers,
+                params={
+                    'after': start_timestamp,
+                    'per_page': 200
+                },
+                timeout=_TIMEOUT
+            )
+
+            if response.status_code != 200:
+                print(f"❌ Failed to fetch activities: {response.status_code}")
+                return []
+
+            activities = response.json()
         
         # Enhance activities with detailed data
         enhanced_activities = []
@@ -132,9 +154,10 @@ class PerformancePsychologyEngine:
         
         try:
             # Get detailed activity data
-            detail_response = requests.get(
+            detail_response = _session.get(
                 f'https://www.strava.com/api/v3/activities/{activity_id}',
-                headers=self.headers
+                headers=self.headers,
+                timeout=_TIMEOUT
             )
             
             if detail_response.status_code == 200:
@@ -151,13 +174,14 @@ class PerformancePsychologyEngine:
             
             # Try to get streams for detailed analysis
             try:
-                streams_response = requests.get(
+                streams_response = _session.get(
                     f'https://www.strava.com/api/v3/activities/{activity_id}/streams',
                     headers=self.headers,
                     params={
                         'keys': 'time,distance,heartrate,velocity_smooth,altitude',
                         'key_by_type': 'true'
-                    }
+                    },
+                    timeout=_TIMEOUT
                 )
                 
                 if streams_response.status_code == 200:
@@ -4,16 +4,27 @@ Handles storing, retrieving, and refreshing Strava OAuth tokens
 """
 
 import requests
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any, List
 import os
 
+# Short-lived credentials cache: is_connected() and the API handlers all
+# resolve the same strava_credentials row, and burst traffic turns that
+# into N identical one-row selects
+CREDENTIALS_CACHE_TTL = 60  # seconds
+
 class StravaTokenManager:
     def __init__(self, supabase_client, supabase_admin_client=None):
         self.supabase = supabase_client
         self.supabase_admin = supabase_admin_client or supabase_client
         self.client_id = os.getenv('STRAVA_CLIENT_ID')
         self.client_secret = os.getenv('STRAVA_CLIENT_SECRET')
+        # Pooled session so repeated token refreshes reuse one TLS connection
+        self.http = requests.Session()
+        self._credentials_cache: Dict[str, Any] = {}  # user_id -> (cached_at, row or None)
+        self._credentials_lock = threading.Lock()
     
     def store_credentials(self, user_id: str, token_response: Dict[str, Any]) -> bool:
         """Store Strava credentials in database"""
@@ -37,7 +48,8 @@ class StravaTokenManager:
                 credentials_data,
                 on_conflict='user_id'
             ).execute()
-            
+
+            self._drop_cached_credentials(user_id)
             return len(result.data) > 0
             
         except Exception as e:
@@ -45,20 +57,56 @@ class StravaTokenManager:
             return False
     
     def get_credentials(self, user_id: str) -> Optional[Dict[str, Any]]:
-        """Get Strava credentials for a user"""
+        """Get Strava credentials for a user (cached for a short TTL)"""
+        now = time.time()
+        with self._credentials_lock:
+            entry = self._credentials_cache.get(user_id)
+            if entry and now - entry[0] < CREDENTIALS_CACHE_TTL:
+                return entry[1]
+
         try:
             # Use admin client to bypass RLS for webhook processing
             result = self.supabase_admin.table('strava_credentials').select('*').eq(
                 'user_id', user_id
             ).eq('is_active', True).execute()
-            
-            if result.data:
-                return result.data[0]
-            return None
-            
+
+            credentials = result.data[0] if result.data else None
+            with self._credentials_lock:
+                self._credentials_cache[user_id] = (now, credentials)
+            return credentials
+
         except Exception as e:
             print(f"Error retrieving Strava credentials: {e}")
             return None
+
+    def get_credentials_bulk(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get credentials for many users with a single select
+
+        Coalesces the per-user lookups that cron-style sweeps would
+        otherwise issue one at a time; results seed the cache.
+        """
+        if not user_ids:
+            return {}
+        try:
+            result = self.supabase_admin.table('strava_credentials').select('*').in_(
+                'user_id', list(user_ids)
+            ).eq('is_active', True).execute()
+
+            now = time.time()
+            by_user = {row['user_id']: row for row in result.data}
+            with self._credentials_lock:
+                for user_id in user_ids:
+                    self._credentials_cache[user_id] = (now, by_user.get(user_id))
+            return by_user
+
+        except Exception as e:
+            print(f"Error retrieving Strava credentials in bulk: {e}")
+            return {}
+
+    def _drop_cached_credentials(self, user_id: str) -> None:
+        """Forget a cached row after any write touching it"""
+        with self._credentials_lock:
+            self._credentials_cache.pop(user_id, None)
     
     def get_valid_access_token(self, user_id: str) -> Optional[str]:
         """Get a valid access token, refreshing if necessary"""
@@ -97,7 +145,7 @@ class StravaTokenManager:
                 'grant_type': 'refresh_token'
             }
             
-            response = requests.post(refresh_url, data=refresh_data)
+            response = self.http.post(refresh_url, data=refresh_data, timeout=(3.05, 10))
             response_data = response.json()
             
             if response.status_code == 200:
@@ -126,9 +174,10 @@ class StravaTokenManager:
                 'is_active': False,
                 'updated_at': datetime.now(timezone.utc).isoformat()
             }).eq('user_id', user_id).execute()
-            
+
+            self._drop_cached_credentials(user_id)
             return len(result.data) > 0
-            
+
         except Exception as e:
             print(f"Error invalidating Strava credentials: {e}")
             return False
@@ -8,8 +8,6 @@ import requests
 from datetime import datetime
 from typing import Dict, Any, Optional
 from flask import request, jsonify
-import hashlib
-import hmac
 import logging
 
 class StravaWebhookManager:
@@ -2,11 +2,11 @@
 Production WSGI entry point for Jolt app with webhook-based Strava integration
 """
 
-import os
+import logging
+
 from app import app
 
-print("✅ Jolt app initialized with webhook-based Strava integration")
-print("🎯 Real-time activity processing - no polling needed!")
+logging.getLogger(__name__).info("Jolt app initialized with webhook-based Strava integration")
 
 if __name__ == "__main__":
     app.run()